@@ -0,0 +1,178 @@
+"""
+Асинхронный фасад сервиса отеля.
+Содержит класс AsyncHotelService - awaitable-обёртку над HotelService для asyncio.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import date
+from typing import Any, Callable, Optional, TypeVar
+
+from models import Room, Guest, Booking
+from hotel_service import Hotel, HotelService
+
+T = TypeVar("T")
+
+
+class AsyncHotelService:
+    """
+    Асинхронный фасад HotelService для сетевых приложений на asyncio.
+
+    Изменения (гости, номера, брони, check-in/out) сериализуются через
+    asyncio.Lock и выполняются в пуле потоков, поэтому файловый и сетевой
+    ввод-вывод подписчиков (журнал, SQLite) и сохранение storage не блокируют
+    цикл событий. Запросы только на чтение выполняются сразу в цикле событий,
+    параллельно с изменением в пуле: читатели HotelService не обходят живые
+    словари (берут копию list(d.values()) одним шагом), а индексы и кэш
+    подменяют данные целиком или защищены собственными короткими блокировками.
+    """
+
+    def __init__(
+        self,
+        service: HotelService,
+        storage: Any = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Инициализация фасада.
+
+        Args:
+            service (HotelService): Синхронный сервис отеля.
+            storage (Any): Хранилище с методом save_changes(hotel)
+                (HotelJsonFileIO или HotelSqliteIO); изменения номеров и гостей
+                сохраняются после каждой операции, которая их создаёт.
+            executor (Optional[Executor]): Пул для блокирующих операций. По умолчанию
+                создаётся однопоточный пул, который закрывается в close().
+        """
+        self.service = service
+        self.storage = storage
+        self._own_executor = executor is None
+        self._executor: Executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="hotel-writer"
+        )
+        # Lock создаётся при первом использовании - внутри работающего цикла событий.
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def hotel(self) -> Hotel:
+        """Отель сервиса."""
+        return self.service.hotel
+
+    async def close(self) -> None:
+        """Дождаться текущих изменений и закрыть собственный пул потоков."""
+        async with self._mutation_lock():
+            if self._own_executor:
+                self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> AsyncHotelService:
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    # ===== ИЗМЕНЕНИЯ =====
+
+    async def register_guest(self, name: str, contact: str) -> Guest:
+        """Зарегистрировать нового гостя (см. HotelService.register_guest)."""
+        return await self._mutate(self.service.register_guest, name, contact, persist=True)
+
+    async def add_room(self, number: int, room_type: str, price_per_night: float) -> Room:
+        """Добавить номер в отель (см. HotelService.add_room)."""
+        return await self._mutate(
+            self.service.add_room, number, room_type, price_per_night, persist=True
+        )
+
+    async def create_booking(
+        self, guest_id: str, room_number: int, check_in: date, check_out: date
+    ) -> Booking:
+        """Создать новую бронь (см. HotelService.create_booking)."""
+        return await self._mutate(
+            self.service.create_booking, guest_id, room_number, check_in, check_out
+        )
+
+    async def cancel_booking(self, booking_id: str) -> None:
+        """Отменить бронь (см. HotelService.cancel_booking)."""
+        await self._mutate(self.service.cancel_booking, booking_id)
+
+    async def check_in(self, booking_id: str, current_date: date) -> None:
+        """Заселить гостя (см. HotelService.check_in)."""
+        await self._mutate(self.service.check_in, booking_id, current_date, persist=True)
+
+    async def check_out(self, booking_id: str, current_date: date) -> float:
+        """Выселить гостя и вернуть итоговую стоимость (см. HotelService.check_out)."""
+        return await self._mutate(
+            self.service.check_out, booking_id, current_date, persist=True
+        )
+
+    async def save(self) -> None:
+        """Сохранить накопленные изменения номеров и гостей в пуле потоков."""
+        if self.storage is not None:
+            async with self._mutation_lock():
+                await self._run(self.storage.save_changes, self.hotel)
+
+    # ===== ЧТЕНИЕ (в цикле событий, без asyncio.Lock) =====
+
+    async def get_guest(self, guest_id: str) -> Guest:
+        """Получить гостя по ID."""
+        return self.service.get_guest(guest_id)
+
+    async def list_guests(self) -> list[Guest]:
+        """Получить список всех гостей."""
+        return self.service.list_guests()
+
+    async def list_rooms(self) -> list[Room]:
+        """Получить список всех номеров."""
+        return self.service.list_rooms()
+
+    async def get_available_rooms(
+        self, check_in: date, check_out: date, room_type: Optional[str] = None
+    ) -> list[Room]:
+        """Получить доступные номера на период."""
+        return self.service.get_available_rooms(check_in, check_out, room_type)
+
+    async def get_booking(self, booking_id: str) -> Booking:
+        """Получить бронь по ID."""
+        return self.service.get_booking(booking_id)
+
+    async def get_guest_bookings(self, guest_id: str) -> list[Booking]:
+        """Получить все брони гостя."""
+        return self.service.get_guest_bookings(guest_id)
+
+    async def list_bookings(self) -> list[Booking]:
+        """Получить список всех броней."""
+        return self.service.list_bookings()
+
+    async def get_active_bookings(self) -> list[Booking]:
+        """Получить активные брони."""
+        return self.service.get_active_bookings()
+
+    async def get_occupancy_report(self) -> dict[str, int]:
+        """Получить отчёт по загруженности."""
+        return self.service.get_occupancy_report()
+
+    async def calculate_total_revenue(self) -> float:
+        """Рассчитать общий доход."""
+        return self.service.calculate_total_revenue()
+
+    # ===== ВНУТРЕННИЕ МЕТОДЫ =====
+
+    async def _mutate(self, func: Callable[..., T], *args: Any, persist: bool = False) -> T:
+        """Выполнить изменение под asyncio.Lock в пуле потоков (и сохранить изменения)."""
+        async with self._mutation_lock():
+            result = await self._run(func, *args)
+            if persist and self.storage is not None:
+                await self._run(self.storage.save_changes, self.hotel)
+            return result
+
+    def _mutation_lock(self) -> asyncio.Lock:
+        """Блокировка, сериализующая изменения."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _run(self, func: Callable[..., T], *args: Any) -> T:
+        """Выполнить блокирующую функцию в пуле потоков."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
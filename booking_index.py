@@ -0,0 +1,226 @@
+"""
+Индексы броней для быстрых проверок доступности.
+Содержит класс RoomIntervalIndex - отсортированные интервалы броней по номерам,
+класс BookingListener - базовый подписчик на изменения броней и класс
+QueuedListener - доставку уведомлений подписчику в фоновом потоке.
+"""
+
+from __future__ import annotations
+
+import copy
+import queue
+import threading
+from bisect import bisect_left
+from datetime import date
+from typing import Dict, Optional
+
+from models import Booking
+
+
+class RoomIntervalIndex:
+    """
+    Индекс активных броней (BOOKED / CHECKED_IN) по номерам комнат.
+
+    Для каждого номера хранится список броней, отсортированный по дате заезда.
+    Активные брони одного номера не пересекаются, поэтому список отсортирован
+    и по дате выезда, а проверка пересечения сводится к одному бинарному поиску.
+
+    Изменения (под Hotel.lock) не трогают списки на месте: для номера строится
+    новая пара (даты заезда, брони) и подменяется одним присваиванием, поэтому
+    читатели без блокировки всегда видят согласованную пару.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустого индекса."""
+        self._rooms: Dict[int, tuple[list[date], list[Booking]]] = {}
+
+    def add(self, booking: Booking) -> None:
+        """Добавить бронь в индекс."""
+        number = booking.room.number
+        starts, bookings = self._rooms.get(number, ((), ()))
+        pos = bisect_left(starts, booking.check_in)
+        self._rooms[number] = (
+            [*starts[:pos], booking.check_in, *starts[pos:]],
+            [*bookings[:pos], booking, *bookings[pos:]],
+        )
+
+    def remove(self, booking: Booking) -> None:
+        """Удалить бронь из индекса (если она там есть)."""
+        number = booking.room.number
+        entry = self._rooms.get(number)
+        if entry is None:
+            return
+        starts, bookings = entry
+        pos = bisect_left(starts, booking.check_in)
+        while pos < len(starts) and starts[pos] == booking.check_in:
+            if bookings[pos] is booking:
+                if len(starts) == 1:
+                    del self._rooms[number]
+                else:
+                    self._rooms[number] = (
+                        starts[:pos] + starts[pos + 1:],
+                        bookings[:pos] + bookings[pos + 1:],
+                    )
+                return
+            pos += 1
+
+    def is_free(self, room_number: int, check_in: date, check_out: date) -> bool:
+        """
+        Проверить, свободен ли номер на период за O(log k).
+
+        Args:
+            room_number (int): Номер комнаты.
+            check_in (date): Дата заезда.
+            check_out (date): Дата выезда.
+
+        Returns:
+            bool: True, если ни одна активная бронь не пересекается с периодом.
+        """
+        entry = self._rooms.get(room_number)
+        if entry is None:
+            return True
+        starts, bookings = entry
+        # Последняя бронь, начинающаяся раньше check_out, - единственный кандидат.
+        pos = bisect_left(starts, check_out)
+        if pos == 0:
+            return True
+        return bookings[pos - 1].check_out <= check_in
+
+    def free_intervals(
+        self, room_number: int, start: date, end: date
+    ) -> list[tuple[date, date]]:
+        """
+        Свободные периоды номера внутри [start, end).
+
+        Первая бронь, пересекающая окно, находится бинарным поиском, далее
+        брони обходятся по порядку до конца окна.
+
+        Args:
+            room_number (int): Номер комнаты.
+            start (date): Начало окна.
+            end (date): Конец окна (не включительно).
+
+        Returns:
+            list[tuple[date, date]]: Свободные периоды (начало, конец) по возрастанию.
+        """
+        if end <= start:
+            return []
+        entry = self._rooms.get(room_number)
+        if entry is None:
+            return [(start, end)]
+        starts, bookings = entry
+        pos = bisect_left(starts, start)
+        if pos > 0 and bookings[pos - 1].check_out > start:
+            pos -= 1
+        free = []
+        cursor = start
+        for booking in bookings[pos:]:
+            if booking.check_in >= end:
+                break
+            if booking.check_in > cursor:
+                free.append((cursor, booking.check_in))
+            cursor = max(cursor, booking.check_out)
+        if cursor < end:
+            free.append((cursor, end))
+        return free
+
+    def bookings_for(self, room_number: int) -> list[Booking]:
+        """Получить активные брони номера, отсортированные по дате заезда."""
+        entry = self._rooms.get(room_number)
+        return list(entry[1]) if entry is not None else []
+
+    def clear(self) -> None:
+        """Очистить индекс."""
+        self._rooms.clear()
+
+
+class BookingListener:
+    """
+    Базовый класс подписчика на изменения броней.
+
+    Подписчики регистрируются через Hotel.add_listener и получают уведомления
+    после того, как Hotel обновил свои индексы. Уведомления приходят под
+    Hotel.lock, поэтому подписчик должен быть быстрым; подписчиков с
+    вводом-выводом оборачивают в QueuedListener. Методы по умолчанию ничего не делают.
+    """
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Бронь добавлена в отель."""
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Статус брони изменён (booking.status уже содержит новый статус)."""
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Бронь удалена из отеля."""
+
+
+class QueuedListener(BookingListener):
+    """
+    Подписчик, доставляющий уведомления другому подписчику в фоновом потоке.
+
+    Уведомление кладётся в очередь вместе с копией брони (статус на момент
+    события), и Hotel.lock освобождается без ожидания ввода-вывода. Поток
+    доставляет события строго по порядку. Первая ошибка доставки
+    запоминается и поднимается из flush() или close(); события, не
+    доставленные до аварийного завершения процесса, теряются.
+    """
+
+    def __init__(self, listener: BookingListener, name: str = "listener-queue") -> None:
+        """
+        Инициализация очереди и запуск потока доставки.
+
+        Args:
+            listener (BookingListener): Подписчик, получающий уведомления.
+            name (str): Имя потока доставки.
+        """
+        self.listener = listener
+        self.error: Optional[BaseException] = None
+        self._queue: queue.Queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Поставить уведомление о новой брони в очередь."""
+        self._queue.put((self.listener.on_booking_added, (copy.copy(booking),)))
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Поставить уведомление о смене статуса в очередь."""
+        self._queue.put(
+            (self.listener.on_booking_status_changed, (copy.copy(booking), old_status))
+        )
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Поставить уведомление об удалении брони в очередь."""
+        self._queue.put((self.listener.on_booking_removed, (copy.copy(booking),)))
+
+    def flush(self) -> None:
+        """Дождаться доставки всех поставленных событий и поднять ошибку доставки."""
+        self._queue.join()
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def close(self) -> None:
+        """Доставить оставшиеся события, остановить поток и закрыть подписчика."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        close = getattr(self.listener, "close", None)
+        if close is not None:
+            close()
+        self.flush()
+
+    def _run(self) -> None:
+        """Цикл доставки событий."""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                method, args = item
+                method(*args)
+            except Exception as e:  # noqa: BLE001 - ошибка поднимается в flush()
+                if self.error is None:
+                    self.error = e
+            finally:
+                self._queue.task_done()
@@ -0,0 +1,108 @@
+"""
+Отслеживание изменений коллекций отеля.
+Содержит класс TrackedDict - словарь, запоминающий изменённые и удалённые ключи.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, Tuple
+
+
+class TrackedDict(dict):
+    """
+    Словарь, который запоминает изменённые ("грязные") и удалённые ключи.
+
+    Запись и удаление через обычный интерфейс dict отмечаются автоматически.
+    Изменения атрибутов самих значений (например, Room.is_occupied) нужно
+    отмечать явно через mark_dirty. Хранилища забирают изменения через
+    take_changes и сохраняют только их. Счётчик version растёт при каждом
+    добавлении или удалении ключа - по нему можно инвалидировать агрегаты.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """Инициализация словаря; исходное содержимое считается сохранённым."""
+        super().__init__(*args, **kwargs)
+        self.dirty: set = set()
+        self.deleted: set = set()
+        self.version = 0
+
+    def __setitem__(self, key, value) -> None:
+        super().__setitem__(key, value)
+        self.version += 1
+        self.dirty.add(key)
+        self.deleted.discard(key)
+
+    def __delitem__(self, key) -> None:
+        super().__delitem__(key)
+        self.version += 1
+        self.dirty.discard(key)
+        self.deleted.add(key)
+
+    def pop(self, key, *default):
+        """Удалить ключ и вернуть значение (как dict.pop)."""
+        existed = key in self
+        value = super().pop(key, *default)
+        if existed:
+            self.version += 1
+            self.dirty.discard(key)
+            self.deleted.add(key)
+        return value
+
+    def setdefault(self, key, default=None):
+        """Вернуть значение ключа, добавив default при отсутствии."""
+        if key not in self:
+            self[key] = default
+        return super().__getitem__(key)
+
+    def update(self, *args, **kwargs) -> None:
+        """Обновить словарь, отметив все записанные ключи."""
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self) -> None:
+        """Удалить все ключи."""
+        self.deleted.update(self.keys())
+        self.dirty.clear()
+        super().clear()
+        self.version += 1
+
+    def set_clean(self, key, value) -> None:
+        """Записать значение, не отмечая его как изменённое (при загрузке)."""
+        super().__setitem__(key, value)
+        self.version += 1
+
+    def mark_dirty(self, key) -> None:
+        """Отметить значение по ключу как изменённое."""
+        if key in self:
+            self.dirty.add(key)
+
+    def has_changes(self) -> bool:
+        """Есть ли несохранённые изменения."""
+        return bool(self.dirty or self.deleted)
+
+    def take_changes(self) -> Tuple[list, list]:
+        """
+        Забрать накопленные изменения и сбросить их.
+
+        Returns:
+            Tuple[list, list]: Изменённые значения и удалённые ключи.
+        """
+        # Наборы подменяются целиком, чтобы не итерироваться по изменяемому set.
+        dirty, self.dirty = self.dirty, set()
+        deleted, self.deleted = self.deleted, set()
+        get = super().get
+        changed = [value for value in map(get, dirty) if value is not None]
+        return changed, list(deleted)
+
+    def restore_changes(self, keys: Iterable, deleted: Iterable) -> None:
+        """Вернуть изменения, которые не удалось сохранить."""
+        for key in keys:
+            self.mark_dirty(key)
+        for key in deleted:
+            if key not in self:
+                self.deleted.add(key)
+
+    def clear_changes(self) -> None:
+        """Считать текущее содержимое сохранённым."""
+        self.dirty.clear()
+        self.deleted.clear()
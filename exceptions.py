@@ -29,6 +29,11 @@ class JsonStorageError(HotelError):
     pass
 
 
+class SqliteStorageError(HotelError):
+    """Исключение: ошибка при работе с SQLite-хранилищем."""
+    pass
+
+
 class PaymentError(HotelError):
     """Исключение: ошибка при расчёте платежа."""
     pass
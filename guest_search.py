@@ -0,0 +1,193 @@
+"""
+Поиск гостей по имени и контакту.
+Содержит класс GuestSearchIndex - точный поиск по контакту и поиск по префиксу имени.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from bisect import bisect_left
+from heapq import merge
+from typing import Dict, Iterable, Iterator
+
+from models import Guest
+from change_tracking import TrackedDict
+
+_PHONE_RE = re.compile(r"\+?[\d\s\-().]+")
+# Новые ключи имён копятся в малом списке и вливаются в основной, когда
+# малый список превышает 1/_MERGE_RATIO основного (но не меньше _MERGE_MIN).
+_MERGE_MIN = 256
+_MERGE_RATIO = 64
+
+
+def normalize_contact(contact: str) -> str:
+    """
+    Привести контакт к виду для точного сравнения.
+
+    Email сравнивается без учёта регистра, у телефона остаются только
+    цифры (и ведущий "+").
+    """
+    value = contact.strip().lower()
+    if _PHONE_RE.fullmatch(value) and any(ch.isdigit() for ch in value):
+        digits = "".join(ch for ch in value if ch.isdigit())
+        return "+" + digits if value.startswith("+") else digits
+    return value
+
+
+def normalize_name(name: str) -> str:
+    """Привести имя к нижнему регистру с одиночными пробелами."""
+    return " ".join(name.casefold().split())
+
+
+class GuestSearchIndex:
+    """
+    Индекс гостей для поиска по контакту и по началу имени.
+
+    Контакты хранятся в словаре (нормализованный контакт -> ID гостей).
+    Для имён хранится отсортированный список ключей (суффикс имени, начиная
+    с каждого слова, ID гостя): "john doe" и "doe" для гостя "John Doe".
+    Поиск по префиксу - бинарный поиск и обход k подходящих ключей,
+    O(log n + k). Гости, добавленные в обход индекса (например, при
+    загрузке из хранилища), обнаруживаются по TrackedDict.version, и индекс
+    перестраивается при следующем запросе.
+
+    Запросы идут без блокировки, поэтому изменения не трогают опубликованные
+    списки. Ключи имён хранятся парой (основной список, малый список новых
+    ключей), которая подменяется одним присваиванием: add копирует только
+    малый список (до max(_MERGE_MIN, n / _MERGE_RATIO) ключей), а основной
+    пересобирается за O(n), когда малый вырос, - не чаще раза на
+    n / _MERGE_RATIO добавлений. Поиск сливает подходящие ключи обоих списков.
+    Списки ID у контактов тоже заменяются целиком.
+
+    add сам записывает гостя в словарь под блокировкой индекса: запрос,
+    заметивший новую версию словаря, ждёт на блокировке окончания add
+    и не запускает лишнюю перестройку.
+    """
+
+    def __init__(self, guests: TrackedDict) -> None:
+        """
+        Инициализация и построение индекса.
+
+        Args:
+            guests (TrackedDict): Словарь гостей отеля (ID -> Guest).
+        """
+        self.guests = guests
+        self._lock = threading.Lock()
+        self._names: tuple[list[tuple[str, str]], list[tuple[str, str]]] = ([], [])
+        self._contacts: Dict[str, list[str]] = {}
+        self._version = -1
+        self._sync()
+
+    def add(self, guest: Guest) -> None:
+        """
+        Записать гостя в словарь гостей и добавить в индекс.
+
+        Если индекс отставал от словаря, он будет перестроен при следующем запросе.
+        """
+        with self._lock:
+            stale = self._version != self.guests.version
+            self.guests[guest.guest_id] = guest
+            if stale:
+                return
+            names, recent = self._names
+            recent = sorted(recent + self._name_keys(guest))
+            if len(recent) > max(_MERGE_MIN, len(names) // _MERGE_RATIO):
+                # Слияние двух отсортированных серий - линейный проход timsort.
+                names, recent = sorted(names + recent), []
+            contact = normalize_contact(guest.contact)
+            self._contacts[contact] = [*self._contacts.get(contact, ()), guest.guest_id]
+            self._names = (names, recent)
+            self._version = self.guests.version
+
+    def rebuild(self) -> None:
+        """Перестроить индекс по всем гостям за O(n log n)."""
+        with self._lock:
+            self._rebuild_locked()
+
+    # ===== ПОИСК =====
+
+    def find_by_contact(self, contact: str) -> list[Guest]:
+        """
+        Найти гостей с точно совпадающим контактом (после нормализации).
+
+        Args:
+            contact (str): Email или телефон.
+
+        Returns:
+            list[Guest]: Гости с этим контактом.
+        """
+        self._sync()
+        ids = self._contacts.get(normalize_contact(contact), ())
+        return self._guests(ids)
+
+    def search(self, query: str, limit: int = 10) -> list[Guest]:
+        """
+        Найти до limit гостей: сначала по точному контакту, затем по началу имени
+        или любого слова имени.
+
+        Args:
+            query (str): Контакт или начало имени.
+            limit (int): Максимальное количество результатов.
+
+        Returns:
+            list[Guest]: Найденные гости без повторов.
+        """
+        if limit <= 0 or not query.strip():
+            return []
+        self._sync()
+        found: Dict[str, None] = dict.fromkeys(
+            self._contacts.get(normalize_contact(query), ())
+        )
+        prefix = normalize_name(query)
+        names, recent = self._names
+        for _, guest_id in merge(
+            self._prefix_keys(names, prefix), self._prefix_keys(recent, prefix)
+        ):
+            if len(found) >= limit:
+                break
+            found.setdefault(guest_id)
+        return self._guests(list(found)[:limit])
+
+    # ===== ВНУТРЕННИЕ МЕТОДЫ =====
+
+    def _sync(self) -> None:
+        """Перестроить индекс, если словарь гостей менялся в обход add."""
+        if self._version != self.guests.version:
+            with self._lock:
+                if self._version != self.guests.version:
+                    self._rebuild_locked()
+
+    def _rebuild_locked(self) -> None:
+        """Перестроить индекс (вызывается под блокировкой)."""
+        version = self.guests.version
+        names: list[tuple[str, str]] = []
+        contacts: Dict[str, list[str]] = {}
+        for guest in list(self.guests.values()):
+            names.extend(self._name_keys(guest))
+            contacts.setdefault(normalize_contact(guest.contact), []).append(guest.guest_id)
+        names.sort()
+        self._names = (names, [])
+        self._contacts = contacts
+        self._version = version
+
+    @staticmethod
+    def _prefix_keys(
+        names: list[tuple[str, str]], prefix: str
+    ) -> Iterator[tuple[str, str]]:
+        """Ключи отсортированного списка, начинающиеся с prefix, по порядку."""
+        pos = bisect_left(names, (prefix, ""))
+        while pos < len(names) and names[pos][0].startswith(prefix):
+            yield names[pos]
+            pos += 1
+
+    @staticmethod
+    def _name_keys(guest: Guest) -> list[tuple[str, str]]:
+        """Ключи имени гостя: суффикс имени с каждого слова и ID гостя."""
+        words = normalize_name(guest.name).split(" ")
+        return [(" ".join(words[i:]), guest.guest_id) for i in range(len(words))]
+
+    def _guests(self, ids: Iterable[str]) -> list[Guest]:
+        """Получить объекты гостей по ID (пропуская удалённых)."""
+        guests = self.guests
+        return [guests[guest_id] for guest_id in ids if guest_id in guests]
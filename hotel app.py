@@ -1,12 +1,27 @@
 """
 Демонстрационное консольное приложение для системы бронирования отеля.
 Главный файл для запуска: python hotel_app.py
+
+Хранилище выбирается переменной окружения HOTEL_STORAGE:
+    json (по умолчанию) - rooms.json / guests.json + журнал броней;
+    sqlite - база данных HOTEL_DB (по умолчанию hotel.db).
 """
 
+from __future__ import annotations
+
+import os
 from datetime import date
 
 from hotel_service import Hotel, HotelService
-from storage_json import HotelJsonFileIO, JsonStorageError
+from booking_index import QueuedListener
+from storage_json import (
+    HotelJsonFileIO,
+    BookingJournal,
+    JournalCompactor,
+    WriteBehindSaver,
+    JsonStorageError,
+)
+from storage_sqlite import HotelSqliteIO
 from exceptions import HotelError
 from payments import Invoice
 
@@ -44,20 +59,74 @@ def display_menu() -> None:
     print("=" * 50)
 
 
-def main() -> None:
-    """Главная функция приложения."""
-    hotel = Hotel("Luxury Hotel")
-    service = HotelService(hotel)
+def load_json_storage(hotel: Hotel) -> tuple[HotelJsonFileIO, list]:
+    """
+    Загрузить отель из JSON-файлов и журнала броней.
+
+    Если загрузка не удалась, журнал и компактификатор не подключаются:
+    иначе следующая компактификация записала бы неполное состояние в снимок
+    поверх сохранённых данных.
+    """
     storage = HotelJsonFileIO()
+    journal = BookingJournal()
+    compactor = JournalCompactor(hotel, journal)
 
     try:
-        for room in storage.load_rooms():
-            hotel.rooms[room.number] = room
-        for guest in storage.load_guests():
-            hotel.guests[guest.guest_id] = guest
+        storage.load_into(hotel)
         print("✓ Initial data loaded from JSON")
+        events = compactor.load()
+        if events or hotel.bookings:
+            print(f"✓ Restored {len(hotel.bookings)} bookings ({events} journal events)")
     except JsonStorageError as e:
         print(f"⚠ Warning: {e}")
+        print("⚠ Booking journal is not attached: bookings will not be saved")
+        return storage, []
+    return storage, [QueuedListener(journal, name="booking-journal"), compactor]
+
+
+def load_sqlite_storage(hotel: Hotel) -> tuple[HotelSqliteIO, list]:
+    """Загрузить отель из SQLite-базы (пустая база заполняется из JSON-файлов)."""
+    storage = HotelSqliteIO(os.environ.get("HOTEL_DB", "hotel.db"))
+    try:
+        rooms = storage.load_rooms()
+        guests = storage.load_guests()
+        if not rooms and not guests:
+            json_storage = HotelJsonFileIO()
+            rooms = json_storage.load_rooms()
+            guests = json_storage.load_guests()
+            storage.save_rooms(rooms)
+            storage.save_guests(guests)
+        for room in rooms:
+            hotel.rooms[room.number] = room
+        for guest in guests:
+            hotel.guests[guest.guest_id] = guest
+        hotel.rooms.clear_changes()
+        hotel.guests.clear_changes()
+        for booking in storage.load_bookings(hotel):
+            hotel.add_booking(booking)
+        print(f"✓ Initial data loaded from SQLite ({len(hotel.bookings)} bookings)")
+        if storage.skipped_bookings:
+            print(
+                f"⚠ Warning: skipped {len(storage.skipped_bookings)} bookings "
+                "of unknown rooms or guests"
+            )
+    except HotelError as e:
+        print(f"⚠ Warning: {e}")
+    return storage, [QueuedListener(storage, name="sqlite-writer")]
+
+
+def main() -> None:
+    """Главная функция приложения."""
+    hotel = Hotel("Luxury Hotel")
+    service = HotelService(hotel)
+    if os.environ.get("HOTEL_STORAGE", "json").lower() == "sqlite":
+        storage, listeners = load_sqlite_storage(hotel)
+    else:
+        storage, listeners = load_json_storage(hotel)
+    for listener in listeners:
+        hotel.add_listener(listener)
+    saver = WriteBehindSaver(hotel, storage)
+    hotel.add_listener(saver)
 
     while True:
         try:
@@ -69,6 +138,7 @@ def main() -> None:
                 room_type = input("Room type (single/double/suite): ")
                 price = float(input("Price per night: "))
                 service.add_room(number, room_type, price)
+                saver.schedule()
                 print("✓ Room added successfully")
 
             elif choice == "2":
@@ -88,6 +158,7 @@ def main() -> None:
                 name = input("Guest name: ")
                 contact = input("Contact (email or phone): ")
                 guest = service.register_guest(name, contact)
+                saver.schedule()
                 print(f"✓ Guest registered with ID: {guest.guest_id}")
 
             elif choice == "4":
@@ -176,8 +247,12 @@ def main() -> None:
                 print(f"\nTotal Revenue: ${revenue:.2f}")
 
             elif choice == "0":
-                storage.save_rooms(list(hotel.rooms.values()))
-                storage.save_guests(list(hotel.guests.values()))
+                saver.close()
+                for listener in reversed(listeners):
+                    if hasattr(listener, "wait"):
+                        listener.wait()
+                    if hasattr(listener, "close"):
+                        listener.close()
                 print("✓ Data saved. Goodbye!")
                 break
 
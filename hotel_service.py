@@ -5,37 +5,94 @@
 
 from __future__ import annotations
 
-from datetime import date
-from typing import Dict, Optional
-import uuid
+from contextlib import ExitStack, contextmanager, suppress
+from datetime import date, datetime, timedelta
+from math import isclose
+from typing import Dict, Iterable, Iterator, Optional
+import threading
 
 from models import Room, Guest, Booking, BookingStatus
+from booking_index import BookingListener, RoomIntervalIndex
+from change_tracking import TrackedDict
+from availability import (
+    AvailabilityCache,
+    OccupancyBitmapEngine,
+    RoomTypeInventory,
+    availability_calendar,
+    occupied_counts,
+)
+from revenue_rollup import RevenueRollup
+from id_generator import IdGenerator, UlidGenerator
+from guest_search import GuestSearchIndex
 from exceptions import (
+    HotelError,
     EntityNotFoundError,
     BookingConflictError,
     InvalidOperationError,
 )
 
 
+# Статусы, при которых бронь занимает номер.
+ACTIVE_STATUSES = (BookingStatus.BOOKED, BookingStatus.CHECKED_IN)
+
+
 class Hotel:
     """
     Модель отеля, управляющая номерами, гостями и бронированиями.
 
     Атрибуты:
         name (str): Название отеля.
-        rooms (Dict[int, Room]): Словарь номеров (ключ - номер комнаты).
-        guests (Dict[str, Guest]): Словарь гостей (ключ - ID гостя).
+        rooms (TrackedDict[int, Room]): Словарь номеров (ключ - номер комнаты)
+            с отслеживанием изменений.
+        guests (TrackedDict[str, Guest]): Словарь гостей (ключ - ID гостя)
+            с отслеживанием изменений.
         bookings (Dict[str, Booking]): Словарь броней (ключ - ID брони).
+        room_index (RoomIntervalIndex): Индекс активных броней по номерам.
+        guest_index (Dict[str, Dict[str, Booking]]): Брони каждого гостя
+            (ID гостя -> ID брони -> бронь) в порядке создания.
+        bookings_by_status (Dict[str, Dict[str, Booking]]): Брони, разложенные
+            по статусам (статус -> ID брони -> бронь).
+        revenue_total (float): Доход от завершённых броней.
+        revenue_by_room_type (Dict[str, float]): Доход по типам номеров.
+        listeners (list[BookingListener]): Подписчики на изменения броней.
+        debug (bool): Сверять агрегаты с полным пересчётом при чтении отчётов.
+        lock (threading.RLock): Короткая блокировка изменений коллекций, индексов
+            и агрегатов. Чтение идёт без блокировки: читатели сначала снимают
+            копию словаря (list(d.values()) выполняется одним шагом), а индексы
+            подменяют изменённые данные целиком.
+
+    Изменения одного номера (бронь, заселение, выезд, отмена) дополнительно
+    сериализуются блокировкой номера (room_lock). Порядок захвата: сначала
+    блокировки номеров по возрастанию номера, затем lock.
+
+    Подписчики (listeners) вызываются под lock и должны быть быстрыми;
+    подписчиков с вводом-выводом (журнал, SQLite) подключают через QueuedListener.
     """
 
-    def __init__(self, name: str) -> None:
+    def __init__(self, name: str, debug: bool = False) -> None:
         """Инициализация отеля."""
         if not name:
             raise InvalidOperationError("Hotel name is required")
         self.name: str = name
-        self.rooms: Dict[int, Room] = {}
-        self.guests: Dict[str, Guest] = {}
+        self.debug: bool = debug
+        self.rooms: Dict[int, Room] = TrackedDict()
+        self.guests: Dict[str, Guest] = TrackedDict()
         self.bookings: Dict[str, Booking] = {}
+        self.room_index: RoomIntervalIndex = RoomIntervalIndex()
+        self.guest_index: Dict[str, Dict[str, Booking]] = {}
+        self.bookings_by_status: Dict[str, Dict[str, Booking]] = {
+            status: {} for status in BookingStatus.all_statuses()
+        }
+        self.revenue_total: float = 0.0
+        self.revenue_by_room_type: Dict[str, float] = {}
+        self.listeners: list[BookingListener] = []
+        self._occupied_count = 0
+        self._occupied_version = -1
+        self._room_counts: Dict[str, int] = {}
+        self._room_counts_version = -1
+        self.lock = threading.RLock()
+        self._room_locks: Dict[int, threading.RLock] = {}
+        self._room_locks_guard = threading.Lock()
 
     def add_room(self, number: int, room_type: str, price_per_night: float) -> Room:
         """
@@ -52,10 +109,11 @@ class Hotel:
         Raises:
             InvalidOperationError: Если номер уже существует.
         """
-        if number in self.rooms:
-            raise InvalidOperationError(f"Room {number} already exists")
         room = Room(number=number, room_type=room_type, price_per_night=price_per_night)
-        self.rooms[number] = room
+        with self.lock:
+            if number in self.rooms:
+                raise InvalidOperationError(f"Room {number} already exists")
+            self.rooms[number] = room
         return room
 
     def remove_room(self, number: int) -> None:
@@ -69,11 +127,12 @@ class Hotel:
             EntityNotFoundError: Если номер не найден.
             InvalidOperationError: Если номер занят.
         """
-        if number not in self.rooms:
-            raise EntityNotFoundError(f"Room {number} does not exist")
-        if self.rooms[number].is_occupied:
-            raise InvalidOperationError("Cannot remove occupied room")
-        del self.rooms[number]
+        with self.room_lock(number), self.lock:
+            if number not in self.rooms:
+                raise EntityNotFoundError(f"Room {number} does not exist")
+            if self.rooms[number].is_occupied:
+                raise InvalidOperationError("Cannot remove occupied room")
+            del self.rooms[number]
 
     def list_rooms(self) -> list[Room]:
         """Получить список всех номеров."""
@@ -96,6 +155,273 @@ class Hotel:
             raise EntityNotFoundError(f"Room {number} does not exist")
         return self.rooms[number]
 
+    def room_lock(self, number: int) -> threading.RLock:
+        """
+        Получить блокировку номера (создаётся при первом обращении).
+
+        Args:
+            number (int): Номер комнаты.
+
+        Returns:
+            threading.RLock: Блокировка изменений броней этого номера.
+        """
+        lock = self._room_locks.get(number)
+        if lock is None:
+            with self._room_locks_guard:
+                lock = self._room_locks.setdefault(number, threading.RLock())
+        return lock
+
+    @contextmanager
+    def room_locks(self, numbers: Iterable[int]) -> Iterator[None]:
+        """
+        Захватить блокировки нескольких номеров.
+
+        Блокировки берутся по возрастанию номера, поэтому параллельные
+        операции над пересекающимися наборами номеров не взаимоблокируются.
+
+        Args:
+            numbers (Iterable[int]): Номера комнат.
+        """
+        with ExitStack() as stack:
+            for number in sorted(set(numbers)):
+                stack.enter_context(self.room_lock(number))
+            yield
+
+    def set_room_occupied(self, room: Room, occupied: bool) -> None:
+        """
+        Изменить флаг занятости номера и отметить номер как изменённый.
+
+        Args:
+            room (Room): Объект номера.
+            occupied (bool): Занят ли номер.
+        """
+        with self.lock:
+            if room.is_occupied != occupied:
+                room.is_occupied = occupied
+                self.rooms.mark_dirty(room.number)
+                if self._occupied_version == self.rooms.version:
+                    self._occupied_count += 1 if occupied else -1
+
+    def occupied_count(self) -> int:
+        """
+        Количество занятых номеров.
+
+        Счётчик обновляется в set_room_occupied и пересчитывается только
+        после добавления или удаления номеров.
+        """
+        if self._occupied_version != self.rooms.version:
+            # Пересчёт под lock: иначе параллельный set_room_occupied потеряется.
+            with self.lock:
+                if self._occupied_version != self.rooms.version:
+                    rooms = list(self.rooms.values())
+                    self._occupied_count = sum(1 for r in rooms if r.is_occupied)
+                    self._occupied_version = self.rooms.version
+        return self._occupied_count
+
+    def room_counts_by_type(self) -> Dict[str, int]:
+        """
+        Количество номеров каждого типа.
+
+        Пересчитывается только после добавления или удаления номеров.
+        """
+        if self._room_counts_version != self.rooms.version:
+            with self.lock:
+                if self._room_counts_version != self.rooms.version:
+                    counts: Dict[str, int] = {}
+                    for room in list(self.rooms.values()):
+                        counts[room.room_type] = counts.get(room.room_type, 0) + 1
+                    self._room_counts = counts
+                    self._room_counts_version = self.rooms.version
+        return self._room_counts
+
+    def verify_aggregates(self) -> None:
+        """
+        Сверить агрегаты и индексы с полным пересчётом (для отладки).
+
+        Raises:
+            HotelError: Если агрегаты расходятся с пересчётом.
+        """
+        with self.lock:
+            occupied = sum(1 for r in self.rooms.values() if r.is_occupied)
+            if occupied != self.occupied_count():
+                raise HotelError(
+                    f"Occupied count mismatch: {self.occupied_count()} != {occupied}"
+                )
+            by_type: Dict[str, float] = {}
+            for booking in self.bookings.values():
+                if booking.status == BookingStatus.CHECKED_OUT:
+                    room_type = booking.room.room_type
+                    amount = booking.calculate_total_price()
+                    by_type[room_type] = by_type.get(room_type, 0.0) + amount
+            if not isclose(sum(by_type.values()), self.revenue_total, abs_tol=1e-6):
+                raise HotelError(
+                    f"Revenue mismatch: {self.revenue_total} != {sum(by_type.values())}"
+                )
+            for room_type in set(by_type) | set(self.revenue_by_room_type):
+                expected = by_type.get(room_type, 0.0)
+                actual = self.revenue_by_room_type.get(room_type, 0.0)
+                if not isclose(expected, actual, abs_tol=1e-6):
+                    raise HotelError(f"Revenue mismatch for {room_type}: {actual} != {expected}")
+            for status, bucket in self.bookings_by_status.items():
+                if any(b.status != status for b in bucket.values()):
+                    raise HotelError(f"Status bucket {status} is inconsistent")
+            buckets = self.bookings_by_status.values()
+            if sum(len(bucket) for bucket in buckets) != len(self.bookings):
+                raise HotelError("Status buckets do not cover all bookings")
+
+    def _index_booking(self, booking: Booking) -> None:
+        """Записать бронь в коллекцию и индексы (под lock)."""
+        self.bookings[booking.booking_id] = booking
+        self.guest_index.setdefault(booking.guest.guest_id, {})[booking.booking_id] = booking
+        self.bookings_by_status[booking.status][booking.booking_id] = booking
+        if booking.status in ACTIVE_STATUSES:
+            self.room_index.add(booking)
+        elif booking.status == BookingStatus.CHECKED_OUT:
+            self._add_revenue(booking, 1)
+
+    def _unindex_booking(self, booking: Booking) -> None:
+        """Удалить бронь из коллекции и индексов (под lock)."""
+        booking_id = booking.booking_id
+        self.bookings.pop(booking_id, None)
+        guest_bookings = self.guest_index.get(booking.guest.guest_id)
+        if guest_bookings is not None:
+            guest_bookings.pop(booking_id, None)
+            if not guest_bookings:
+                del self.guest_index[booking.guest.guest_id]
+        self.bookings_by_status[booking.status].pop(booking_id, None)
+        if booking.status in ACTIVE_STATUSES:
+            self.room_index.remove(booking)
+        elif booking.status == BookingStatus.CHECKED_OUT:
+            self._add_revenue(booking, -1)
+
+    def _add_revenue(self, booking: Booking, sign: int) -> None:
+        """Учесть (sign=1) или исключить (sign=-1) доход завершённой брони."""
+        amount = sign * booking.calculate_total_price()
+        room_type = booking.room.room_type
+        self.revenue_total += amount
+        self.revenue_by_room_type[room_type] = (
+            self.revenue_by_room_type.get(room_type, 0.0) + amount
+        )
+
+    def add_booking(self, booking: Booking) -> None:
+        """
+        Добавить бронь в отель и обновить индексы.
+
+        Args:
+            booking (Booking): Объект брони.
+
+        Если подписчик поднимает исключение, бронь удаляется из индексов,
+        подписчики, уже получившие уведомление, получают on_booking_removed,
+        и исключение пробрасывается дальше - отель остаётся без брони.
+
+        Raises:
+            InvalidOperationError: Если бронь с таким ID уже существует.
+        """
+        with self.lock:
+            if booking.booking_id in self.bookings:
+                raise InvalidOperationError(f"Booking {booking.booking_id} already exists")
+            self._index_booking(booking)
+            notified: list[BookingListener] = []
+            try:
+                for listener in self.listeners:
+                    listener.on_booking_added(booking)
+                    notified.append(listener)
+            except Exception:
+                self._unindex_booking(booking)
+                for listener in reversed(notified):
+                    with suppress(Exception):
+                        listener.on_booking_removed(booking)
+                raise
+
+    def remove_booking(self, booking_id: str) -> Booking:
+        """
+        Удалить бронь из отеля и из всех индексов.
+
+        Args:
+            booking_id (str): ID брони.
+
+        Returns:
+            Booking: Удалённая бронь.
+
+        Уведомление получают все подписчики, даже если один из них поднял
+        исключение; первое исключение пробрасывается после уведомления всех.
+        Бронь к этому моменту уже удалена из отеля.
+
+        Raises:
+            EntityNotFoundError: Если бронь не найдена.
+        """
+        with self.lock:
+            booking = self.bookings.get(booking_id)
+            if booking is None:
+                raise EntityNotFoundError(f"Booking {booking_id} does not exist")
+            self._unindex_booking(booking)
+            error: Optional[Exception] = None
+            for listener in self.listeners:
+                try:
+                    listener.on_booking_removed(booking)
+                except Exception as e:  # noqa: BLE001 - поднимается после цикла
+                    error = error or e
+            if error is not None:
+                raise error
+        return booking
+
+    def set_booking_status(self, booking: Booking, status: str) -> None:
+        """
+        Сменить статус брони и обновить индексы.
+
+        При заселении и выселении здесь же меняется флаг занятости номера, до
+        уведомления подписчиков. Уведомление получают все подписчики, даже если
+        один из них поднял исключение; первое исключение пробрасывается после
+        уведомления всех, статус к этому моменту уже изменён.
+
+        Args:
+            booking (Booking): Объект брони.
+            status (str): Новый статус.
+
+        Raises:
+            InvalidOperationError: Если статус некорректен.
+        """
+        if not BookingStatus.is_valid(status):
+            raise InvalidOperationError(f"Invalid status: {status}")
+        with self.lock:
+            old_status = booking.status
+            was_active = old_status in ACTIVE_STATUSES
+            is_active = status in ACTIVE_STATUSES
+            del self.bookings_by_status[old_status][booking.booking_id]
+            self.bookings_by_status[status][booking.booking_id] = booking
+            booking.status = status
+            if was_active and not is_active:
+                self.room_index.remove(booking)
+            elif is_active and not was_active:
+                self.room_index.add(booking)
+            if old_status == BookingStatus.CHECKED_OUT and status != old_status:
+                self._add_revenue(booking, -1)
+            elif status == BookingStatus.CHECKED_OUT and status != old_status:
+                self._add_revenue(booking, 1)
+            if status == BookingStatus.CHECKED_IN:
+                self.set_room_occupied(booking.room, True)
+            elif status == BookingStatus.CHECKED_OUT:
+                self.set_room_occupied(booking.room, False)
+            error: Optional[Exception] = None
+            for listener in self.listeners:
+                try:
+                    listener.on_booking_status_changed(booking, old_status)
+                except Exception as e:  # noqa: BLE001 - поднимается после цикла
+                    error = error or e
+            if error is not None:
+                raise error
+
+    def add_listener(self, listener: BookingListener) -> None:
+        """Подписать объект на изменения броней."""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener: BookingListener) -> None:
+        """Отписать объект от изменений броней."""
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
     def __repr__(self) -> str:
         """Строковое представление отеля."""
         return f"Hotel({self.name}, rooms={len(self.rooms)}, guests={len(self.guests)})"
@@ -105,11 +431,52 @@ class HotelService:
     """
     Сервис отеля - главный фасад для работы с системой бронирования.
     Управляет гостями, комнатами, бронями и всеми операциями.
+
+    Сервис можно использовать из нескольких потоков: операции над одним
+    номером (create_booking, check_in, check_out, cancel_booking) берут
+    блокировку этого номера, поэтому двойная бронь невозможна, а операции
+    над разными номерами идут параллельно. Чтение (списки, поиск, отчёты)
+    выполняется без блокировок и не задерживает запись.
     """
 
-    def __init__(self, hotel: Hotel) -> None:
-        """Инициализация сервиса с объектом отеля."""
+    def __init__(
+        self,
+        hotel: Hotel,
+        availability_engine: Optional[OccupancyBitmapEngine] = None,
+        availability_cache: Optional[AvailabilityCache] = None,
+        id_generator: Optional[IdGenerator] = None,
+    ) -> None:
+        """
+        Инициализация сервиса с объектом отеля.
+
+        Args:
+            hotel (Hotel): Объект отеля.
+            availability_engine (Optional[OccupancyBitmapEngine]): Битовая матрица
+                занятости для поиска свободных номеров. Если не задана, используется
+                индекс интервалов отеля.
+            availability_cache (Optional[AvailabilityCache]): LRU-кэш результатов
+                get_available_rooms. Если не задан, результаты не кэшируются.
+            id_generator (Optional[IdGenerator]): Генератор ID новых гостей и броней.
+                По умолчанию UlidGenerator (упорядоченные по времени ID); ранее
+                созданные ID в формате UUID4 продолжают работать.
+        """
         self.hotel: Hotel = hotel
+        self.id_generator: IdGenerator = id_generator or UlidGenerator()
+        self.availability_engine: Optional[OccupancyBitmapEngine] = availability_engine
+        if availability_engine is not None:
+            availability_engine.rebuild(hotel.bookings.values())
+            hotel.add_listener(availability_engine)
+        self.availability_cache: Optional[AvailabilityCache] = availability_cache
+        if availability_cache is not None:
+            availability_cache.clear()
+            hotel.add_listener(availability_cache)
+        self.revenue_rollup: RevenueRollup = RevenueRollup()
+        self.revenue_rollup.rebuild(hotel.bookings.values())
+        hotel.add_listener(self.revenue_rollup)
+        self.room_inventory: RoomTypeInventory = RoomTypeInventory(hotel)
+        self.room_inventory.rebuild(hotel.bookings.values())
+        hotel.add_listener(self.room_inventory)
+        self.guest_search: GuestSearchIndex = GuestSearchIndex(hotel.guests)
 
     # ===== ГОСТИ =====
 
@@ -124,9 +491,10 @@ class HotelService:
         Returns:
             Guest: Объект зарегистрированного гостя.
         """
-        guest_id = str(uuid.uuid4())
+        guest_id = self.id_generator()
         guest = Guest(guest_id=guest_id, name=name, contact=contact)
-        self.hotel.guests[guest_id] = guest
+        with self.hotel.lock:
+            self.guest_search.add(guest)
         return guest
 
     def get_guest(self, guest_id: str) -> Guest:
@@ -150,6 +518,32 @@ class HotelService:
         """Получить список всех гостей."""
         return list(self.hotel.guests.values())
 
+    def search_guests(self, query: str, limit: int = 10) -> list[Guest]:
+        """
+        Найти гостей по контакту или началу имени (любого слова имени).
+
+        Args:
+            query (str): Email, телефон или начало имени.
+            limit (int): Максимальное количество результатов.
+
+        Returns:
+            list[Guest]: До limit гостей; точные совпадения контакта идут первыми.
+        """
+        return self.guest_search.search(query, limit)
+
+    def find_guests_by_contact(self, contact: str) -> list[Guest]:
+        """
+        Найти гостей с точно совпадающим контактом (email без учёта регистра,
+        телефон без пробелов и разделителей).
+
+        Args:
+            contact (str): Контакт гостя.
+
+        Returns:
+            list[Guest]: Гости с этим контактом.
+        """
+        return self.guest_search.find_by_contact(contact)
+
     # ===== НОМЕРА =====
 
     def add_room(self, number: int, room_type: str, price_per_night: float) -> Room:
@@ -190,6 +584,28 @@ class HotelService:
         if check_out <= check_in:
             raise InvalidOperationError("check_out must be after check_in")
 
+        cache = self.availability_cache
+        if cache is None:
+            return self._find_available_rooms(check_in, check_out, room_type)
+        available = cache.get(check_in, check_out, room_type)
+        if available is None:
+            # Сброс кэша во время поиска отменит запись устаревшего результата.
+            generation = cache.generation
+            available = self._find_available_rooms(check_in, check_out, room_type)
+            cache.put(check_in, check_out, room_type, available, generation)
+        return available
+
+    def _find_available_rooms(
+        self, check_in: date, check_out: date, room_type: Optional[str]
+    ) -> list[Room]:
+        """Найти доступные номера без кэша."""
+        if self.availability_engine is not None:
+            rooms = [
+                r for r in self.hotel.list_rooms()
+                if not room_type or r.room_type == room_type
+            ]
+            return self.availability_engine.available_rooms(rooms, check_in, check_out)
+
         available = []
         for room in self.hotel.list_rooms():
             if room_type and room.room_type != room_type:
@@ -198,18 +614,118 @@ class HotelService:
                 available.append(room)
         return available
 
+    def find_free_windows(
+        self, start: date, end: date, nights: int, room_type: Optional[str] = None
+    ) -> list[tuple[Room, date]]:
+        """
+        Найти все варианты заезда на nights ночей внутри периода [start, end).
+
+        Для каждого номера берутся свободные интервалы из индекса, и по каждому
+        интервалу длины не меньше nights перечисляются допустимые даты заезда -
+        один проход по окну вместо вызова get_available_rooms на каждую дату.
+
+        Args:
+            start (date): Самая ранняя дата заезда.
+            end (date): Самая поздняя дата выезда.
+            nights (int): Количество ночей.
+            room_type (Optional[str]): Фильтр по типу комнаты.
+
+        Returns:
+            list[tuple[Room, date]]: Пары (номер, дата заезда), упорядоченные
+                по дате заезда, затем по порядку номеров.
+
+        Raises:
+            InvalidOperationError: Если nights меньше 1 или период некорректен.
+        """
+        if nights < 1:
+            raise InvalidOperationError("nights must be at least 1")
+        if end <= start:
+            raise InvalidOperationError("end must be after start")
+        stay = timedelta(days=nights)
+        windows: list[tuple[Room, date]] = []
+        for room in self.hotel.list_rooms():
+            if room_type and room.room_type != room_type:
+                continue
+            for free_start, free_end in self.hotel.room_index.free_intervals(
+                room.number, start, end
+            ):
+                check_in = free_start
+                while check_in + stay <= free_end:
+                    windows.append((room, check_in))
+                    check_in += timedelta(days=1)
+        windows.sort(key=lambda window: window[1])
+        return windows
+
+    def count_available_rooms(
+        self, check_in: date, check_out: date, room_type: str
+    ) -> int:
+        """
+        Сколько номеров типа room_type свободно на весь период.
+
+        Сначала берётся остаток инвентаря (RoomTypeInventory.max_available):
+        если он равен нулю или числу номеров типа, ответ готов за O(ночей).
+        Иначе остаток - лишь верхняя граница, и номера типа проверяются по
+        индексу интервалов до тех пор, пока не найдено столько свободных.
+
+        Args:
+            check_in (date): Дата заезда.
+            check_out (date): Дата выезда.
+            room_type (str): Тип комнаты.
+
+        Returns:
+            int: Число номеров, которые можно забронировать на период.
+
+        Raises:
+            InvalidOperationError: Если даты некорректны.
+        """
+        if check_out <= check_in:
+            raise InvalidOperationError("check_out must be after check_in")
+        bound = self.room_inventory.max_available(room_type, check_in, check_out)
+        if bound == 0 or bound == self.hotel.room_counts_by_type().get(room_type, 0):
+            return bound
+        is_free = self.hotel.room_index.is_free
+        count = 0
+        for room in self.hotel.list_rooms():
+            if room.room_type == room_type and is_free(room.number, check_in, check_out):
+                count += 1
+                if count == bound:
+                    break
+        return count
+
+    def get_availability_calendar(
+        self, start: date, days: int, room_type: Optional[str] = None
+    ) -> dict[int, dict]:
+        """
+        Получить сетку доступности номеров на days дней начиная со start.
+
+        Вся сетка строится одним проходом по броням вместо вызова
+        get_available_rooms на каждую ночь.
+
+        Args:
+            start (date): Первый день сетки.
+            days (int): Количество дней.
+            room_type (Optional[str]): Фильтр по типу комнаты.
+
+        Returns:
+            dict[int, dict]: Для каждого номера: "bitmap" (бит i - номер свободен
+                в день start + i) и "free_intervals" (список пар check_in, check_out).
+
+        Raises:
+            InvalidOperationError: Если days отрицательно.
+        """
+        if days < 0:
+            raise InvalidOperationError("days must not be negative")
+        rooms = [
+            r for r in self.hotel.list_rooms()
+            if not room_type or r.room_type == room_type
+        ]
+        return availability_calendar(rooms, self.get_active_bookings(), start, days)
+
     def _room_is_available(
         self, room: Room, check_in: date, check_out: date
     ) -> bool:
         """Проверить, свободна ли комната на период."""
-        for booking in self.hotel.bookings.values():
-            if booking.room.number != room.number:
-                continue
-            if booking.status in (BookingStatus.CANCELLED, BookingStatus.CHECKED_OUT):
-                continue
-            if check_in < booking.check_out and booking.check_in < check_out:
-                return False
-        return True
+        return self.hotel.room_index.is_free(room.number, check_in, check_out)
 
     # ===== БРОНИРОВАНИЕ =====
 
@@ -233,24 +749,188 @@ class HotelService:
             BookingConflictError: Если комната не доступна.
         """
         guest = self.get_guest(guest_id)
-        room = self.hotel.get_room(room_number)
 
-        if not self._room_is_available(room, check_in, check_out):
-            raise BookingConflictError(
-                f"Room {room_number} is not available for {check_in} to {check_out}"
+        # Проверка доступности и вставка - под блокировкой номера.
+        with self.hotel.room_lock(room_number):
+            room = self.hotel.get_room(room_number)
+            if not self._room_is_available(room, check_in, check_out):
+                raise BookingConflictError(
+                    f"Room {room_number} is not available for {check_in} to {check_out}"
+                )
+
+            booking_id = self.id_generator()
+            booking = Booking(
+                booking_id=booking_id,
+                guest=guest,
+                room=room,
+                check_in=check_in,
+                check_out=check_out,
             )
-
-        booking_id = str(uuid.uuid4())
-        booking = Booking(
-            booking_id=booking_id,
-            guest=guest,
-            room=room,
-            check_in=check_in,
-            check_out=check_out,
-        )
-        self.hotel.bookings[booking_id] = booking
+            self.hotel.add_booking(booking)
         return booking
 
+    def create_bookings_bulk(self, requests: Iterable[dict]) -> list[dict]:
+        """
+        Создать много броней за один проход: либо все, либо ни одной.
+
+        Каждый запрос - словарь с ключами guest_id, room_number, check_in,
+        check_out. Гости и номера ищутся один раз, запросы сортируются по
+        номеру и дате заезда, после чего одним проходом проверяются конфликты
+        запросов между собой и с существующими бронями. Проверка и вставка
+        выполняются под блокировками всех затронутых номеров.
+
+        Args:
+            requests (Iterable[dict]): Запросы на бронирование.
+
+        Returns:
+            list[dict]: Отчёт в порядке запросов: index, status ("created",
+                "failed" или "not_committed", если бронь была корректна, но
+                другой запрос не прошёл), booking (Booking или None), error.
+                Некорректный запрос (не словарь, даты не типа date) получает
+                статус "failed" и не прерывает обработку остальных.
+        """
+        items = list(requests)
+        report = [
+            {"index": i, "status": "failed", "booking": None, "error": None}
+            for i in range(len(items))
+        ]
+        bookings: Dict[int, Booking] = {}
+        for i, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise InvalidOperationError("Request must be a dict")
+                for field in ("check_in", "check_out"):
+                    # datetime - подкласс date, но не сравнивается с датами броней.
+                    if not isinstance(item[field], date) or isinstance(item[field], datetime):
+                        raise InvalidOperationError(f"{field} must be a date")
+                guest = self.get_guest(item["guest_id"])
+                room = self.hotel.get_room(item["room_number"])
+                bookings[i] = Booking(
+                    booking_id=self.id_generator(),
+                    guest=guest,
+                    room=room,
+                    check_in=item["check_in"],
+                    check_out=item["check_out"],
+                )
+            except KeyError as e:
+                report[i]["error"] = f"Missing field: {e}"
+            except HotelError as e:
+                report[i]["error"] = str(e)
+            except (TypeError, AttributeError) as e:
+                report[i]["error"] = f"Malformed request: {e}"
+
+        with self.hotel.room_locks(b.room.number for b in bookings.values()):
+            order = sorted(
+                bookings, key=lambda i: (bookings[i].room.number, bookings[i].check_in)
+            )
+            # previous - последний принятый запрос; у него самая поздняя дата выезда.
+            previous: Optional[int] = None
+            for i in order:
+                booking = bookings[i]
+                number = booking.room.number
+                if number not in self.hotel.rooms:
+                    report[i]["error"] = f"Room {number} does not exist"
+                elif (
+                    previous is not None
+                    and bookings[previous].room.number == number
+                    and bookings[previous].check_out > booking.check_in
+                ):
+                    report[i]["error"] = f"Room {number} overlaps request {previous}"
+                elif not self.hotel.room_index.is_free(
+                    number, booking.check_in, booking.check_out
+                ):
+                    report[i]["error"] = (
+                        f"Room {number} is not available for "
+                        f"{booking.check_in} to {booking.check_out}"
+                    )
+                else:
+                    previous = i
+
+            if any(entry["error"] for entry in report):
+                for i in bookings:
+                    if report[i]["error"] is None:
+                        report[i]["status"] = "not_committed"
+                return report
+
+            self._add_bookings_atomically([bookings[i] for i in sorted(bookings)])
+        for i, booking in bookings.items():
+            report[i]["status"] = "created"
+            report[i]["booking"] = booking
+        return report
+
+    def create_group_booking(
+        self, guest_id: str, room_type: str, count: int, check_in: date, check_out: date
+    ) -> list[Booking]:
+        """
+        Забронировать count номеров типа room_type на один период: все или ни одного.
+
+        Блокировки всех номеров типа берутся по возрастанию номера, поэтому
+        параллельные групповые брони не взаимоблокируются. При ошибке уже
+        добавленные брони удаляются, и в Hotel.bookings ничего не остаётся.
+
+        Args:
+            guest_id (str): ID гостя (организатора группы).
+            room_type (str): Тип комнаты.
+            count (int): Количество номеров.
+            check_in (date): Дата заезда.
+            check_out (date): Дата выезда.
+
+        Returns:
+            list[Booking]: Созданные брони (по возрастанию номера комнаты).
+
+        Raises:
+            EntityNotFoundError: Если гость не найден.
+            InvalidOperationError: Если count меньше 1 или даты некорректны.
+            BookingConflictError: Если свободных номеров типа меньше count.
+        """
+        if count < 1:
+            raise InvalidOperationError("count must be at least 1")
+        if check_out <= check_in:
+            raise InvalidOperationError("check_out must be after check_in")
+        guest = self.get_guest(guest_id)
+        numbers = [r.number for r in self.hotel.list_rooms() if r.room_type == room_type]
+
+        with self.hotel.room_locks(numbers):
+            free = [
+                self.hotel.rooms[number]
+                for number in sorted(numbers)
+                if number in self.hotel.rooms
+                and self.hotel.room_index.is_free(number, check_in, check_out)
+            ]
+            if len(free) < count:
+                raise BookingConflictError(
+                    f"Only {len(free)} of {count} {room_type} rooms are available "
+                    f"for {check_in} to {check_out}"
+                )
+            bookings = [
+                Booking(
+                    booking_id=self.id_generator(),
+                    guest=guest,
+                    room=room,
+                    check_in=check_in,
+                    check_out=check_out,
+                )
+                for room in free[:count]
+            ]
+            self._add_bookings_atomically(bookings)
+        return bookings
+
+    def _add_bookings_atomically(self, bookings: list[Booking]) -> None:
+        """Добавить брони; при ошибке удалить уже добавленные и пробросить ошибку."""
+        added: list[Booking] = []
+        try:
+            for booking in bookings:
+                self.hotel.add_booking(booking)
+                added.append(booking)
+        except Exception:
+            # Неудачную бронь add_booking откатывает сам. remove_booking удаляет
+            # бронь из отеля даже при ошибке подписчика, поэтому откат идёт
+            # до конца, а пробрасывается исходная ошибка.
+            for booking in reversed(added):
+                with suppress(Exception):
+                    self.hotel.remove_booking(booking.booking_id)
+            raise
+
     def get_booking(self, booking_id: str) -> Booking:
         """
         Получить бронь по ID.
@@ -279,7 +959,7 @@ class HotelService:
             list[Booking]: Список броней гостя.
         """
         self.get_guest(guest_id)
-        return [b for b in self.hotel.bookings.values() if b.guest.guest_id == guest_id]
+        return list(self.hotel.guest_index.get(guest_id, {}).values())
 
     def list_bookings(self) -> list[Booking]:
         """Получить список всех броней."""
@@ -297,11 +977,12 @@ class HotelService:
             InvalidOperationError: Если бронь уже завершена.
         """
         booking = self.get_booking(booking_id)
-        if booking.status == BookingStatus.CANCELLED:
-            return
-        if booking.status == BookingStatus.CHECKED_OUT:
-            raise InvalidOperationError("Cannot cancel checked-out booking")
-        booking.status = BookingStatus.CANCELLED
+        with self.hotel.room_lock(booking.room.number):
+            if booking.status == BookingStatus.CANCELLED:
+                return
+            if booking.status == BookingStatus.CHECKED_OUT:
+                raise InvalidOperationError("Cannot cancel checked-out booking")
+            self.hotel.set_booking_status(booking, BookingStatus.CANCELLED)
 
     # ===== CHECK-IN / CHECK-OUT =====
 
@@ -318,19 +999,19 @@ class HotelService:
             InvalidOperationError: Если статус некорректен или дата не совпадает.
         """
         booking = self.get_booking(booking_id)
-        if booking.status != BookingStatus.BOOKED:
-            raise InvalidOperationError(
-                f"Cannot check-in: booking status is {booking.status}"
-            )
-        if current_date != booking.check_in:
-            raise InvalidOperationError(
-                f"Check-in date mismatch: expected {booking.check_in}, got {current_date}"
-            )
-        if booking.room.is_occupied:
-            raise BookingConflictError("Room is already occupied")
-
-        booking.status = BookingStatus.CHECKED_IN
-        booking.room.is_occupied = True
+        with self.hotel.room_lock(booking.room.number):
+            if booking.status != BookingStatus.BOOKED:
+                raise InvalidOperationError(
+                    f"Cannot check-in: booking status is {booking.status}"
+                )
+            if current_date != booking.check_in:
+                raise InvalidOperationError(
+                    f"Check-in date mismatch: expected {booking.check_in}, got {current_date}"
+                )
+            if booking.room.is_occupied:
+                raise BookingConflictError("Room is already occupied")
+
+            self.hotel.set_booking_status(booking, BookingStatus.CHECKED_IN)
 
     def check_out(self, booking_id: str, current_date: date) -> float:
         """
@@ -348,38 +1029,100 @@ class HotelService:
             InvalidOperationError: Если статус некорректен или дата не совпадает.
         """
         booking = self.get_booking(booking_id)
-        if booking.status != BookingStatus.CHECKED_IN:
-            raise InvalidOperationError(
-                f"Cannot check-out: booking status is {booking.status}"
-            )
-        if current_date != booking.check_out:
-            raise InvalidOperationError(
-                f"Check-out date mismatch: expected {booking.check_out}, got {current_date}"
-            )
-
-        booking.status = BookingStatus.CHECKED_OUT
-        booking.room.is_occupied = False
+        with self.hotel.room_lock(booking.room.number):
+            if booking.status != BookingStatus.CHECKED_IN:
+                raise InvalidOperationError(
+                    f"Cannot check-out: booking status is {booking.status}"
+                )
+            if current_date != booking.check_out:
+                raise InvalidOperationError(
+                    f"Check-out date mismatch: expected {booking.check_out}, got {current_date}"
+                )
+
+            self.hotel.set_booking_status(booking, BookingStatus.CHECKED_OUT)
         return booking.calculate_total_price()
+
     def get_active_bookings(self) -> list[Booking]:
-        """Получить список активных броней (BOOKED или CHECKED_IN)."""
-        return [
-            b
-            for b in self.hotel.bookings.values()
-            if b.status in (BookingStatus.BOOKED, BookingStatus.CHECKED_IN)
-        ]
+        """Получить список активных броней (сначала BOOKED, затем CHECKED_IN)."""
+        by_status = self.hotel.bookings_by_status
+        active: list[Booking] = []
+        for status in ACTIVE_STATUSES:
+            # Копия за один шаг: корзины меняются параллельно под Hotel.lock.
+            active += list(by_status[status].values())
+        return active
 
     def get_occupancy_report(self) -> dict[str, int]:
         """Получить отчёт о загруженности номеров."""
+        if self.hotel.debug:
+            self.hotel.verify_aggregates()
+        total = len(self.hotel.rooms)
+        occupied = self.hotel.occupied_count()
         return {
-            "total_rooms": len(self.hotel.rooms),
-            "occupied_rooms": sum(1 for r in self.hotel.rooms.values() if r.is_occupied),
-            "available_rooms": sum(1 for r in self.hotel.rooms.values() if not r.is_occupied),
+            "total_rooms": total,
+            "occupied_rooms": occupied,
+            "available_rooms": total - occupied,
         }
 
+    def get_occupancy_forecast(self, start: date, days: int) -> list[dict]:
+        """
+        Прогноз загрузки на days дней вперёд по активным броням (BOOKED / CHECKED_IN).
+
+        Args:
+            start (date): Первый день прогноза.
+            days (int): Количество дней.
+
+        Returns:
+            list[dict]: Для каждого дня: date, occupied_rooms, occupancy_percent.
+
+        Raises:
+            InvalidOperationError: Если days отрицательно.
+        """
+        if days < 0:
+            raise InvalidOperationError("days must not be negative")
+        counts = occupied_counts(self.get_active_bookings(), start, days)
+        total = len(self.hotel.rooms)
+        return [
+            {
+                "date": start + timedelta(days=offset),
+                "occupied_rooms": occupied,
+                "occupancy_percent": round(occupied * 100 / total, 1) if total else 0.0,
+            }
+            for offset, occupied in enumerate(counts)
+        ]
+
     def calculate_total_revenue(self) -> float:
         """Вычислить общий доход от завершённых броней."""
-        total = 0.0
-        for booking in self.hotel.bookings.values():
-            if booking.status == BookingStatus.CHECKED_OUT:
-                total += booking.calculate_total_price()
-        return total
+        if self.hotel.debug:
+            self.hotel.verify_aggregates()
+        return self.hotel.revenue_total
+
+    def calculate_revenue_between(
+        self, start: date, end: date, room_type: Optional[str] = None
+    ) -> float:
+        """
+        Вычислить доход от броней с выездом в период [start, end].
+
+        Args:
+            start (date): Первый день периода.
+            end (date): Последний день периода (включительно).
+            room_type (Optional[str]): Фильтр по типу комнаты.
+
+        Returns:
+            float: Доход за период.
+
+        Raises:
+            InvalidOperationError: Если end раньше start.
+        """
+        return self.revenue_rollup.revenue_between(start, end, room_type)
+
+    def get_monthly_revenue(
+        self, start: date, end: date, room_type: Optional[str] = None
+    ) -> dict[str, float]:
+        """Получить доход по месяцам периода [start, end] (ключ - "YYYY-MM")."""
+        return self.revenue_rollup.monthly_revenue(start, end, room_type)
+
+    def calculate_revenue_by_room_type(self) -> dict[str, float]:
+        """Получить доход от завершённых броней по типам номеров."""
+        if self.hotel.debug:
+            self.hotel.verify_aggregates()
+        return dict(self.hotel.revenue_by_room_type)
@@ -0,0 +1,82 @@
+"""
+Генераторы идентификаторов гостей и броней.
+Содержит класс UlidGenerator - компактные монотонные ID, упорядоченные по времени.
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+import uuid
+from typing import Callable, Optional
+
+# Генератор ID - любой вызываемый объект без аргументов, возвращающий строку.
+IdGenerator = Callable[[], str]
+
+# Алфавит Crockford Base32: символы идут по возрастанию кодов ASCII,
+# поэтому строки ID сравниваются так же, как числа.
+_CROCKFORD = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+# Все пары символов: одна пара кодирует 10 бит, ID из 130 бит - 13 пар.
+_PAIRS = [first + second for first in _CROCKFORD for second in _CROCKFORD]
+_PAIR_SHIFTS = tuple(range(120, -1, -10))
+_RANDOM_BITS = 80
+_RANDOM_LIMIT = 1 << _RANDOM_BITS
+
+
+def uuid4_id() -> str:
+    """Случайный UUID4 в виде строки (прежний формат ID)."""
+    return str(uuid.uuid4())
+
+
+class UlidGenerator:
+    """
+    Генератор ID в формате ULID: 26 символов Crockford Base32.
+
+    Старшие 48 бит - время в миллисекундах, младшие 80 бит - случайная часть.
+    Внутри процесса ID строго возрастают: в пределах одной миллисекунды
+    (или если часы пошли назад) случайная часть увеличивается на 1.
+    Поэтому новые записи добавляются в хранилища в порядке ключа,
+    а сортировка ID совпадает с порядком создания.
+    """
+
+    def __init__(self, clock: Optional[Callable[[], int]] = None) -> None:
+        """
+        Инициализация генератора.
+
+        Args:
+            clock (Optional[Callable[[], int]]): Источник времени в миллисекундах
+                (по умолчанию time.time_ns() // 1_000_000).
+        """
+        self._clock = clock or (lambda: time.time_ns() // 1_000_000)
+        self._lock = threading.Lock()
+        self._last_time = -1
+        self._last_random = 0
+
+    def __call__(self) -> str:
+        """Получить новый ID."""
+        with self._lock:
+            now = self._clock()
+            if now > self._last_time:
+                self._last_time = now
+                self._last_random = secrets.randbits(_RANDOM_BITS)
+            else:
+                self._last_random += 1
+                if self._last_random >= _RANDOM_LIMIT:
+                    self._last_time += 1
+                    self._last_random = 0
+            value = (self._last_time << _RANDOM_BITS) | self._last_random
+        return self.encode(value)
+
+    @staticmethod
+    def encode(value: int) -> str:
+        """Закодировать 128-битное число в 26 символов Crockford Base32."""
+        return "".join([_PAIRS[(value >> shift) & 1023] for shift in _PAIR_SHIFTS])
+
+    @staticmethod
+    def timestamp_ms(ulid: str) -> int:
+        """Время создания ID (миллисекунды Unix)."""
+        value = 0
+        for char in ulid[:10]:
+            value = value * 32 + _CROCKFORD.index(char)
+        return value
@@ -5,11 +5,16 @@
 
 from __future__ import annotations
 
+import sys
 from dataclasses import dataclass, field
 from datetime import date
 
 from exceptions import InvalidOperationError
 
+# Модели создаются миллионами (история броней), поэтому они без __dict__.
+# dataclass(slots=True) доступен с Python 3.10; на 3.8/3.9 - обычные dataclass.
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class BookingStatus:
     """Статусы брони (enum-подобный класс)."""
@@ -29,6 +34,11 @@ class BookingStatus:
             cls.CANCELLED,
         )
 
+    @classmethod
+    def is_active(cls, status: str) -> bool:
+        """Проверить, занимает ли бронь с этим статусом номер."""
+        return status in (cls.BOOKED, cls.CHECKED_IN)
+
     @classmethod
     def all_statuses(cls) -> list[str]:
         """Получить все возможные статусы."""
@@ -46,6 +56,8 @@ class Room:
         is_occupied (bool): Занята ли комната в настоящий момент.
     """
 
+    __slots__ = ("number", "room_type", "price_per_night", "is_occupied")
+
     def __init__(
         self,
         number: int,
@@ -74,7 +86,7 @@ class Room:
         )
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Guest:
     """
     Модель гостя отеля.
@@ -103,7 +115,7 @@ class Guest:
         return f"Guest({self.guest_id}, {self.name})"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class Booking:
     """
     Модель брони номера.
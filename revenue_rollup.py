@@ -0,0 +1,258 @@
+"""
+Дневные и месячные сводки дохода.
+Содержит классы FenwickTree и RevenueRollup - доход по дням с запросами по диапазону дат.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import date
+from typing import Dict, Iterable, Optional
+
+from models import Booking, BookingStatus
+from booking_index import BookingListener
+from exceptions import InvalidOperationError
+
+
+class FenwickTree:
+    """
+    Дерево Фенвика (двоичное индексированное дерево) над массивом сумм.
+
+    Изменение элемента и сумма на префиксе - O(log n). Размер может расти:
+    при расширении дерево перестраивается за O(n).
+    """
+
+    def __init__(self, values: Optional[list[float]] = None) -> None:
+        """
+        Построить дерево по списку значений за O(n).
+
+        Args:
+            values (Optional[list[float]]): Начальные значения.
+        """
+        self._values: list[float] = list(values or [])
+        self._tree: list[float] = []
+        self._build()
+
+    def __len__(self) -> int:
+        """Размер массива."""
+        return len(self._values)
+
+    def add(self, index: int, delta: float) -> None:
+        """Прибавить delta к элементу index."""
+        self._values[index] += delta
+        i = index + 1
+        tree = self._tree
+        size = len(tree)
+        while i < size:
+            tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, end: int) -> float:
+        """Сумма элементов [0, end)."""
+        end = min(max(end, 0), len(self._values))
+        total = 0.0
+        tree = self._tree
+        while end > 0:
+            total += tree[end]
+            end -= end & -end
+        return total
+
+    def range_sum(self, start: int, end: int) -> float:
+        """Сумма элементов [start, end)."""
+        if end <= start:
+            return 0.0
+        return self.prefix_sum(end) - self.prefix_sum(start)
+
+    def value(self, index: int) -> float:
+        """Значение элемента index."""
+        return self._values[index]
+
+    def resize(self, prepend: int, append: int) -> None:
+        """Добавить prepend нулей в начало и append нулей в конец."""
+        self._values = [0.0] * prepend + self._values + [0.0] * append
+        self._build()
+
+    def _build(self) -> None:
+        """Построить дерево по self._values за O(n)."""
+        size = len(self._values) + 1
+        tree = [0.0] * size
+        for i, value in enumerate(self._values, start=1):
+            tree[i] += value
+            parent = i + (i & -i)
+            if parent < size:
+                tree[parent] += tree[i]
+        self._tree = tree
+
+
+class RevenueRollup(BookingListener):
+    """
+    Доход завершённых броней по дням выезда с запросами по диапазону дат.
+
+    Для всего отеля и для каждого типа номера хранится дерево Фенвика по
+    дням, поэтому доход за произвольный период считается за O(log n).
+    Доход брони относится ко дню выезда (check_out). Окно дат растёт
+    автоматически. Расширение окна перестраивает деревья, поэтому изменения
+    и запросы сериализуются собственной короткой блокировкой.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустой сводки."""
+        self._lock = threading.Lock()
+        self._origin: Optional[int] = None
+        self._total = FenwickTree()
+        self._by_type: Dict[str, FenwickTree] = {}
+
+    # ===== ОБНОВЛЕНИЕ =====
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Учесть бронь, добавленную сразу завершённой."""
+        if booking.status == BookingStatus.CHECKED_OUT:
+            self._record(booking, 1)
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Учесть доход при выезде (или исключить при откате статуса)."""
+        if booking.status == BookingStatus.CHECKED_OUT and old_status != booking.status:
+            self._record(booking, 1)
+        elif old_status == BookingStatus.CHECKED_OUT and booking.status != old_status:
+            self._record(booking, -1)
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Исключить доход удалённой завершённой брони."""
+        if booking.status == BookingStatus.CHECKED_OUT:
+            self._record(booking, -1)
+
+    def rebuild(self, bookings: Iterable[Booking]) -> None:
+        """
+        Перестроить сводку по всем броням за O(n + дней).
+
+        Args:
+            bookings (Iterable[Booking]): Все брони отеля.
+        """
+        daily: Dict[str, Dict[int, float]] = {}
+        for booking in bookings:
+            if booking.status != BookingStatus.CHECKED_OUT:
+                continue
+            days = daily.setdefault(booking.room.room_type, {})
+            day = booking.check_out.toordinal()
+            days[day] = days.get(day, 0.0) + booking.calculate_total_price()
+
+        origin: Optional[int] = None
+        total_tree = FenwickTree()
+        by_type: Dict[str, FenwickTree] = {}
+        all_days = [day for days in daily.values() for day in days]
+        if all_days:
+            origin, last = min(all_days), max(all_days)
+            size = last - origin + 1
+            total = [0.0] * size
+            for room_type, days in daily.items():
+                values = [0.0] * size
+                for day, amount in days.items():
+                    values[day - origin] += amount
+                    total[day - origin] += amount
+                by_type[room_type] = FenwickTree(values)
+            total_tree = FenwickTree(total)
+        with self._lock:
+            self._origin = origin
+            self._total = total_tree
+            self._by_type = by_type
+
+    # ===== ЗАПРОСЫ =====
+
+    def revenue_between(
+        self, start: date, end: date, room_type: Optional[str] = None
+    ) -> float:
+        """
+        Доход с выездом в период [start, end] (обе даты включительно).
+
+        Args:
+            start (date): Первый день периода.
+            end (date): Последний день периода.
+            room_type (Optional[str]): Фильтр по типу комнаты.
+
+        Returns:
+            float: Доход за период.
+
+        Raises:
+            InvalidOperationError: Если end раньше start.
+        """
+        if end < start:
+            raise InvalidOperationError("end must not be before start")
+        with self._lock:
+            tree = self._total if room_type is None else self._by_type.get(room_type)
+            if tree is None or self._origin is None:
+                return 0.0
+            first = start.toordinal() - self._origin
+            return tree.range_sum(first, end.toordinal() - self._origin + 1)
+
+    def daily_revenue(
+        self, start: date, end: date, room_type: Optional[str] = None
+    ) -> list[tuple[date, float]]:
+        """Доход по каждому дню периода [start, end]."""
+        if end < start:
+            raise InvalidOperationError("end must not be before start")
+        result = []
+        with self._lock:
+            tree = self._total if room_type is None else self._by_type.get(room_type)
+            for ordinal in range(start.toordinal(), end.toordinal() + 1):
+                index = ordinal - self._origin if self._origin is not None else -1
+                amount = tree.value(index) if tree is not None and 0 <= index < len(tree) else 0.0
+                result.append((date.fromordinal(ordinal), amount))
+        return result
+
+    def monthly_revenue(
+        self, start: date, end: date, room_type: Optional[str] = None
+    ) -> dict[str, float]:
+        """
+        Доход по месяцам периода [start, end] (ключ - "YYYY-MM").
+
+        Каждый месяц - один запрос по диапазону, O(месяцев × log n).
+        """
+        if end < start:
+            raise InvalidOperationError("end must not be before start")
+        result: dict[str, float] = {}
+        month_start = start
+        while month_start <= end:
+            if month_start.month == 12:
+                next_month = date(month_start.year + 1, 1, 1)
+            else:
+                next_month = date(month_start.year, month_start.month + 1, 1)
+            month_end = min(end, date.fromordinal(next_month.toordinal() - 1))
+            key = f"{month_start.year:04d}-{month_start.month:02d}"
+            result[key] = self.revenue_between(month_start, month_end, room_type)
+            month_start = next_month
+        return result
+
+    # ===== ВНУТРЕННИЕ МЕТОДЫ =====
+
+    def _record(self, booking: Booking, sign: int) -> None:
+        """Прибавить (sign=1) или вычесть (sign=-1) доход брони в день выезда."""
+        amount = sign * booking.calculate_total_price()
+        room_type = booking.room.room_type
+        with self._lock:
+            index = self._index(booking.check_out.toordinal())
+            self._total.add(index, amount)
+            tree = self._by_type.get(room_type)
+            if tree is None:
+                tree = FenwickTree([0.0] * len(self._total))
+                self._by_type[room_type] = tree
+            tree.add(index, amount)
+
+    def _index(self, ordinal: int) -> int:
+        """Индекс дня в деревьях; при необходимости окно расширяется (под блокировкой)."""
+        if self._origin is None:
+            self._origin = ordinal
+            self._total.resize(0, 1)
+            return 0
+        size = len(self._total)
+        prepend = append = 0
+        if ordinal < self._origin:
+            # Запас в размер текущего окна, чтобы расширения были редкими.
+            prepend = self._origin - ordinal + size
+        elif ordinal >= self._origin + size:
+            append = max(ordinal - self._origin - size + 1, size)
+        if prepend or append:
+            self._total.resize(prepend, append)
+            for tree in self._by_type.values():
+                tree.resize(prepend, append)
+            self._origin -= prepend
+        return ordinal - self._origin
@@ -1,17 +1,190 @@
 """
 Модуль для работы с JSON-хранилищем.
-Загрузка и сохранение данных о комнатах и гостях.
+Загрузка и сохранение данных о комнатах и гостях, журнал броней.
 """
 
+from __future__ import annotations
+
+import glob
 import json
+import os
+import re
+import tempfile
+import threading
+from datetime import date
+from itertools import chain
 from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, TextIO
+
+from models import Room, Guest, Booking, BookingStatus
+from booking_index import BookingListener
+from exceptions import JsonStorageError, InvalidOperationError
+
+if TYPE_CHECKING:
+    from hotel_service import Hotel
+
+
+_JSON_WHITESPACE = " \t\r\n"
+# Конец скаляра (числа, true/false/null) в JSON-массиве.
+_SCALAR_END = re.compile(r"[,\]\s]")
+
+
+def _atomic_write_json(path: Path, data: Any) -> None:
+    """
+    Атомарно записать JSON: временный файл, fsync и os.replace.
+
+    Raises:
+        OSError: Если ошибка при записи файла.
+    """
+    fd, tmp_name = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def _room_to_dict(room: Room) -> dict:
+    """Сериализовать номер."""
+    return {
+        "number": room.number,
+        "room_type": room.room_type,
+        "price_per_night": room.price_per_night,
+        "is_occupied": room.is_occupied,
+    }
+
+
+def _guest_to_dict(guest: Guest) -> dict:
+    """Сериализовать гостя."""
+    return {
+        "guest_id": guest.guest_id,
+        "name": guest.name,
+        "contact": guest.contact,
+    }
+
+
+def _iter_json_records(path: Path, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """
+    Потоково читать записи из JSON-массива или JSONL-файла.
 
-from models import Room, Guest
-from exceptions import JsonStorageError
+    Формат определяется по первому непробельному символу: "[" - JSON-массив,
+    иначе - по одному JSON-документу на строку. Файл читается блоками по
+    chunk_size символов, в памяти одновременно находится не больше одной записи
+    и одного блока. Скаляр (например, число) может быть разрезан границей блока
+    и при этом разобраться без ошибки, поэтому перед разбором скаляра блоки
+    дочитываются до разделителя.
+
+    Raises:
+        ValueError: Если файл не является корректным JSON-массивом или JSONL.
+    """
+    with path.open("r", encoding="utf-8") as f:
+        buf = f.read(chunk_size)
+        pos = 0
+        while True:
+            while pos < len(buf) and buf[pos] in _JSON_WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                break
+            buf, pos = f.read(chunk_size), 0
+            if not buf:
+                return
+
+        if buf[pos] != "[":
+            rest = buf[pos:] + f.readline()
+            for line in chain(rest.splitlines(), f):
+                if line.strip():
+                    yield json.loads(line)
+            return
+
+        decoder = json.JSONDecoder()
+        pos += 1
+        expect_value = True
+        first = True
+        while True:
+            while pos < len(buf) and buf[pos] in _JSON_WHITESPACE:
+                pos += 1
+            if pos == len(buf):
+                buf, pos = f.read(chunk_size), 0
+                if not buf:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                continue
+            char = buf[pos]
+            if char == "]" and (first or not expect_value):
+                return
+            if not expect_value:
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' in {path}")
+                pos += 1
+                expect_value = True
+                continue
+            if char not in '{["':
+                while not _SCALAR_END.search(buf, pos):
+                    chunk = f.read(chunk_size)
+                    if not chunk:
+                        break
+                    buf, pos = buf[pos:] + chunk, 0
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Запись обрезана границей блока - дочитываем следующий блок.
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    raise
+                buf, pos = buf[pos:] + chunk, 0
+                continue
+            yield item
+            pos = end
+            expect_value = False
+            first = False
+
+
+class _LoaderThread(threading.Thread):
+    """Поток фоновой загрузки: исключение сохраняется и пробрасывается из join."""
+
+    def __init__(self, target: Callable[[], None]) -> None:
+        super().__init__(name="json-loader", daemon=True)
+        self._load = target
+        self.error: Optional[Exception] = None
+
+    def run(self) -> None:
+        """Выполнить загрузку, сохранив исключение."""
+        try:
+            self._load()
+        except Exception as e:  # noqa: BLE001 - пробрасывается из join
+            self.error = e
+
+    def join(self, timeout: Optional[float] = None) -> None:
+        """
+        Дождаться окончания загрузки.
+
+        Raises:
+            Exception: Исключение, которым завершилась загрузка.
+        """
+        super().join(timeout)
+        if self.error is not None and not self.is_alive():
+            raise self.error
 
 
 class HotelJsonFileIO:
-    """Класс для работы с JSON-хранилищем комнат и гостей."""
+    """
+    Класс для работы с JSON-хранилищем комнат и гостей.
+
+    Помимо полной перезаписи (save_rooms / save_guests) поддерживает
+    инкрементальное сохранение save_changes: изменённые записи дописываются
+    в файлы *.delta.jsonl, которые применяются поверх основного файла при
+    загрузке и поглощаются следующей полной перезаписью.
+
+    Полная перезапись сначала целиком записывает данные в *.new, затем
+    удаляет файл изменений и переименовывает *.new в основной файл. Если
+    процесс упал между шагами, оставшийся *.new доводится до конца при
+    следующей загрузке или записи, и устаревший файл изменений не
+    применяется поверх более новых данных.
+    """
 
     def __init__(
         self, rooms_path: str = "rooms.json", guests_path: str = "guests.json"
@@ -25,6 +198,10 @@ class HotelJsonFileIO:
         """
         self.rooms_file = Path(rooms_path)
         self.guests_file = Path(guests_path)
+        self.rooms_delta_file = self.rooms_file.with_name(self.rooms_file.name + ".delta.jsonl")
+        self.guests_delta_file = self.guests_file.with_name(
+            self.guests_file.name + ".delta.jsonl"
+        )
 
     def load_rooms(self) -> list[Room]:
         """
@@ -36,31 +213,34 @@ class HotelJsonFileIO:
         Raises:
             JsonStorageError: Если ошибка при чтении файла.
         """
-        if not self.rooms_file.exists():
-            return []
-        try:
-            with self.rooms_file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (OSError, json.JSONDecodeError) as e:
-            raise JsonStorageError(f"Failed to load rooms: {e}")
+        return list(self.iter_rooms())
+
+    def iter_rooms(self) -> Iterator[Room]:
+        """
+        Потоково читать комнаты из JSON-массива или JSONL-файла.
+
+        Объекты Room создаются по одному, весь документ в память не загружается.
+
+        Yields:
+            Room: Очередной объект Room.
 
-        rooms: list[Room] = []
-        for item in data:
+        Raises:
+            JsonStorageError: Если ошибка при чтении файла.
+        """
+        for item in self._iter_items(self.rooms_file, self.rooms_delta_file, "number", "rooms"):
             try:
-                room = Room(
+                yield Room(
                     number=item["number"],
                     room_type=item["room_type"],
                     price_per_night=item["price_per_night"],
                     is_occupied=item.get("is_occupied", False),
                 )
-                rooms.append(room)
             except (KeyError, ValueError) as e:
                 raise JsonStorageError(f"Invalid room data: {e}")
-        return rooms
 
     def save_rooms(self, rooms: list[Room]) -> None:
         """
-        Сохранить комнаты в JSON.
+        Сохранить комнаты в JSON (атомарно, через временный файл).
 
         Args:
             rooms (list[Room]): Список объектов Room.
@@ -68,18 +248,9 @@ class HotelJsonFileIO:
         Raises:
             JsonStorageError: Если ошибка при записи файла.
         """
-        data = [
-            {
-                "number": r.number,
-                "room_type": r.room_type,
-                "price_per_night": r.price_per_night,
-                "is_occupied": r.is_occupied,
-            }
-            for r in rooms
-        ]
+        data = [_room_to_dict(r) for r in rooms]
         try:
-            with self.rooms_file.open("w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._save_full(self.rooms_file, self.rooms_delta_file, data)
         except OSError as e:
             raise JsonStorageError(f"Failed to save rooms: {e}")
 
@@ -93,30 +264,65 @@ class HotelJsonFileIO:
         Raises:
             JsonStorageError: Если ошибка при чтении файла.
         """
-        if not self.guests_file.exists():
-            return []
-        try:
-            with self.guests_file.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-        except (OSError, json.JSONDecodeError) as e:
-            raise JsonStorageError(f"Failed to load guests: {e}")
+        return list(self.iter_guests())
+
+    def iter_guests(self) -> Iterator[Guest]:
+        """
+        Потоково читать гостей из JSON-массива или JSONL-файла.
+
+        Yields:
+            Guest: Очередной объект Guest.
 
-        guests: list[Guest] = []
-        for item in data:
+        Raises:
+            JsonStorageError: Если ошибка при чтении файла.
+        """
+        for item in self._iter_items(
+            self.guests_file, self.guests_delta_file, "guest_id", "guests"
+        ):
             try:
-                guest = Guest(
+                yield Guest(
                     guest_id=item["guest_id"],
                     name=item["name"],
                     contact=item["contact"],
                 )
-                guests.append(guest)
             except (KeyError, ValueError) as e:
                 raise JsonStorageError(f"Invalid guest data: {e}")
-        return guests
+
+    def load_into(self, hotel: Hotel, background: bool = False) -> Optional[threading.Thread]:
+        """
+        Заполнить отель номерами и гостями в потоковом режиме.
+
+        Записи добавляются в отель по мере чтения и не считаются изменёнными.
+        В фоновом режиме отель можно использовать для поиска до окончания загрузки.
+
+        Args:
+            hotel (Hotel): Отель для заполнения.
+            background (bool): Загружать в фоновом потоке.
+
+        Returns:
+            Optional[threading.Thread]: Поток загрузки (в фоновом режиме) или None.
+                Его join() пробрасывает исключение, которым завершилась загрузка.
+
+        Raises:
+            JsonStorageError: Если ошибка при чтении файла (в синхронном режиме
+                или из join() потока загрузки).
+        """
+        def run() -> None:
+            for room in self.iter_rooms():
+                hotel.rooms.set_clean(room.number, room)
+            for guest in self.iter_guests():
+                hotel.guests.set_clean(guest.guest_id, guest)
+
+        if not background:
+            run()
+            return None
+        thread = _LoaderThread(run)
+        thread.start()
+        return thread
 
     def save_guests(self, guests: list[Guest]) -> None:
         """
-        Сохранить гостей в JSON.
+        Сохранить гостей в JSON (атомарно, через временный файл).
 
         Args:
             guests (list[Guest]): Список объектов Guest.
@@ -124,16 +330,783 @@ class HotelJsonFileIO:
         Raises:
             JsonStorageError: Если ошибка при записи файла.
         """
-        data = [
+        data = [_guest_to_dict(g) for g in guests]
+        try:
+            self._save_full(self.guests_file, self.guests_delta_file, data)
+        except OSError as e:
+            raise JsonStorageError(f"Failed to save guests: {e}")
+
+    def save_changes(self, hotel: Hotel) -> None:
+        """
+        Сохранить только изменённые номера и гостей.
+
+        Изменения дописываются в *.delta.jsonl. Если файл изменений стал
+        больше основного файла, выполняется полная перезапись.
+
+        Args:
+            hotel (Hotel): Отель с отслеживаемыми коллекциями rooms и guests.
+
+        Raises:
+            JsonStorageError: Если ошибка при записи файла.
+        """
+        with hotel.lock:
+            rooms, deleted_rooms = hotel.rooms.take_changes()
+        try:
+            self._save_delta(
+                [_room_to_dict(r) for r in rooms],
+                deleted_rooms,
+                "number",
+                self.rooms_file,
+                self.rooms_delta_file,
+                lambda: self.save_rooms(list(hotel.rooms.values())),
+            )
+        except JsonStorageError:
+            with hotel.lock:
+                hotel.rooms.restore_changes([r.number for r in rooms], deleted_rooms)
+            raise
+
+        with hotel.lock:
+            guests, deleted_guests = hotel.guests.take_changes()
+        try:
+            self._save_delta(
+                [_guest_to_dict(g) for g in guests],
+                deleted_guests,
+                "guest_id",
+                self.guests_file,
+                self.guests_delta_file,
+                lambda: self.save_guests(list(hotel.guests.values())),
+            )
+        except JsonStorageError:
+            with hotel.lock:
+                hotel.guests.restore_changes([g.guest_id for g in guests], deleted_guests)
+            raise
+
+    @staticmethod
+    def _save_delta(
+        changed: list[dict],
+        deleted: list,
+        key: str,
+        base_file: Path,
+        delta_file: Path,
+        save_full: Callable[[], None],
+    ) -> None:
+        """Дописать изменения в файл изменений или перезаписать основной файл."""
+        if not changed and not deleted:
+            return
+        try:
+            HotelJsonFileIO._finish_full_write(base_file, delta_file)
+            base_size = base_file.stat().st_size if base_file.exists() else 0
+            delta_size = delta_file.stat().st_size if delta_file.exists() else 0
+            if delta_size > base_size:
+                save_full()
+                return
+            records = [{"op": "put", "item": item} for item in changed]
+            records += [{"op": "delete", key: k} for k in deleted]
+            lines = [json.dumps(r, ensure_ascii=False) for r in records]
+            with delta_file.open("a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            raise JsonStorageError(f"Failed to save changes to {delta_file}: {e}")
+
+    def _iter_items(
+        self, base_file: Path, delta_file: Path, key: str, what: str
+    ) -> Iterator[dict]:
+        """Потоково читать записи основного файла с применёнными изменениями."""
+        try:
+            self._finish_full_write(base_file, delta_file)
+            delta = self._read_delta(delta_file, key)
+            if base_file.exists():
+                for item in _iter_json_records(base_file):
+                    k = item[key]
+                    if k in delta:
+                        item = delta.pop(k)
+                        if item is None:
+                            continue
+                    yield item
+            for item in delta.values():
+                if item is not None:
+                    yield item
+        except (OSError, KeyError, ValueError) as e:
+            raise JsonStorageError(f"Failed to load {what}: {e}")
+
+    @staticmethod
+    def _save_full(base_file: Path, delta_file: Path, data: list[dict]) -> None:
+        """Полностью перезаписать основной файл через *.new, поглотив файл изменений."""
+        _atomic_write_json(base_file.with_name(base_file.name + ".new"), data)
+        HotelJsonFileIO._finish_full_write(base_file, delta_file)
+
+    @staticmethod
+    def _finish_full_write(base_file: Path, delta_file: Path) -> None:
+        """Довести до конца начатую полную перезапись, если остался файл *.new."""
+        new_file = base_file.with_name(base_file.name + ".new")
+        if not new_file.exists():
+            return
+        # *.new уже содержит все изменения из файла изменений.
+        if delta_file.exists():
+            delta_file.unlink()
+        os.replace(new_file, base_file)
+
+    @staticmethod
+    def _read_delta(delta_file: Path, key: str) -> dict:
+        """Прочитать файл изменений: ключ -> запись (None - запись удалена)."""
+        delta: dict = {}
+        if not delta_file.exists():
+            return delta
+        with delta_file.open("r", encoding="utf-8") as f:
+            lines = f.readlines()
+        for lineno, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                if lineno == len(lines) and not line.endswith("\n"):
+                    break
+                raise
+            if record["op"] == "put":
+                delta[record["item"][key]] = record["item"]
+            else:
+                delta[record[key]] = None
+        return delta
+
+class WriteBehindSaver(BookingListener):
+    """
+    Отложенное сохранение (write-behind) с объединением изменений.
+
+    Изменения броней и вызовы schedule() только увеличивают счётчик
+    ожидающих изменений. Фоновый поток вызывает storage.save_changes(hotel)
+    один раз на пачку: когда накопилось max_pending изменений или прошло
+    flush_interval секунд с первого несохранённого изменения.
+    """
+
+    def __init__(
+        self,
+        hotel: Hotel,
+        storage: Any,
+        flush_interval: float = 1.0,
+        max_pending: int = 100,
+    ) -> None:
+        """
+        Инициализация и запуск фонового потока.
+
+        Args:
+            hotel (Hotel): Отель, изменения которого сохраняются.
+            storage (Any): Хранилище с методом save_changes(hotel).
+            flush_interval (float): Максимальная задержка сохранения в секундах.
+            max_pending (int): Число изменений, после которого сохранение
+                выполняется без ожидания интервала.
+        """
+        if flush_interval <= 0:
+            raise JsonStorageError("flush_interval must be positive")
+        if max_pending <= 0:
+            raise JsonStorageError("max_pending must be positive")
+        self.hotel = hotel
+        self.storage = storage
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.flush_count = 0
+        self.last_error: Optional[Exception] = None
+        self._pending = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Запланировать сохранение после новой брони."""
+        self.schedule()
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Запланировать сохранение после смены статуса."""
+        self.schedule()
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Запланировать сохранение после удаления брони."""
+        self.schedule()
+
+    def schedule(self, count: int = 1) -> None:
+        """
+        Отметить несохранённые изменения.
+
+        Args:
+            count (int): Количество изменений.
+        """
+        with self._cond:
+            self._pending += count
+            if self._pending == count or self._pending >= self.max_pending:
+                self._cond.notify()
+
+    def flush(self) -> None:
+        """
+        Немедленно сохранить накопленные изменения.
+
+        Raises:
+            HotelError: Ошибка хранилища, в том числе отложенная из фонового сохранения.
+        """
+        with self._cond:
+            self._pending = 0
+        self._flush()
+        if self.last_error is not None:
+            error, self.last_error = self.last_error, None
+            raise error
+
+    def close(self) -> None:
+        """Остановить фоновый поток и сохранить оставшиеся изменения."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        """Цикл фонового потока."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                if self._pending < self.max_pending:
+                    self._cond.wait(self.flush_interval)
+                    if self._closed:
+                        return
+                self._pending = 0
+            self._flush()
+
+    def _flush(self) -> None:
+        """Одно сохранение; ошибка запоминается до следующего flush()."""
+        with self._flush_lock:
+            try:
+                self.storage.save_changes(self.hotel)
+                self.flush_count += 1
+            except Exception as e:
+                self.last_error = e
+
+
+class BookingJournal(BookingListener):
+    """
+    Журнал броней в формате JSONL (одно событие на строку, только дозапись).
+
+    Журнал подписывается на изменения броней в Hotel и дописывает события
+    create / cancel / check_in / check_out / delete. При запуске журнал проигрывается,
+    чтобы восстановить Hotel.bookings. fsync выполняется пачками: раз в
+    sync_every событий, а также при sync() и close().
+
+    При компактификации текущий файл журнала переименовывается в очередной
+    нумерованный сегмент *.N.compacting (rotate), а новые события пишутся в
+    новый файл. Сегменты удаляются после записи снимка состояния; если
+    компактификация прервалась, они проигрываются по возрастанию номера.
+    """
+
+    # Событие журнала для каждого статуса брони.
+    STATUS_EVENTS = {
+        BookingStatus.BOOKED: "book",
+        BookingStatus.CHECKED_IN: "check_in",
+        BookingStatus.CHECKED_OUT: "check_out",
+        BookingStatus.CANCELLED: "cancel",
+    }
+
+    def __init__(self, path: str = "bookings.jsonl", sync_every: int = 32) -> None:
+        """
+        Инициализация журнала.
+
+        Args:
+            path (str): Путь к файлу журнала.
+            sync_every (int): Через сколько событий вызывать fsync.
+        """
+        if sync_every <= 0:
+            raise JsonStorageError("sync_every must be positive")
+        self.path = Path(path)
+        # Сегмент прежнего формата (без номера) проигрывается первым.
+        self.compacting_path = self.path.with_name(self.path.name + ".compacting")
+        self.sync_every = sync_every
+        self.events_written = 0
+        self._size = 0
+        self._file: Optional[TextIO] = None
+        self._unsynced = 0
+        self._replaying = False
+        self._lock = threading.Lock()
+
+    # ===== ЗАПИСЬ =====
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Записать событие создания брони."""
+        self.append(
             {
-                "guest_id": g.guest_id,
-                "name": g.name,
-                "contact": g.contact,
+                "event": "create",
+                "booking_id": booking.booking_id,
+                "guest_id": booking.guest.guest_id,
+                "guest_name": booking.guest.name,
+                "guest_contact": booking.guest.contact,
+                "room_number": booking.room.number,
+                "room_type": booking.room.room_type,
+                "price_per_night": booking.room.price_per_night,
+                "check_in": booking.check_in.isoformat(),
+                "check_out": booking.check_out.isoformat(),
+                "status": booking.status,
             }
-            for g in guests
-        ]
+        )
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Записать событие смены статуса брони."""
+        self.append(
+            {
+                "event": self.STATUS_EVENTS[booking.status],
+                "booking_id": booking.booking_id,
+                "status": booking.status,
+            }
+        )
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Записать событие удаления брони."""
+        self.append({"event": "delete", "booking_id": booking.booking_id})
+
+    def append(self, event: dict) -> None:
+        """
+        Дописать событие в журнал.
+
+        Args:
+            event (dict): Событие для записи.
+
+        Raises:
+            JsonStorageError: Если ошибка при записи файла.
+        """
+        if self._replaying:
+            return
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            try:
+                if self._file is None:
+                    self._file = self.path.open("a", encoding="utf-8")
+                    self._size = self._file.tell()
+                self._file.write(line)
+                self._file.flush()
+                self.events_written += 1
+                self._size += len(line.encode("utf-8"))
+                self._unsynced += 1
+                if self._unsynced >= self.sync_every:
+                    self._sync_locked()
+            except OSError as e:
+                raise JsonStorageError(f"Failed to write booking journal: {e}")
+
+    def sync(self) -> None:
+        """Сбросить записанные события на диск (fsync)."""
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        """Сбросить события на диск и закрыть файл журнала."""
+        with self._lock:
+            self._close_locked()
+
+    def size_bytes(self) -> int:
+        """Текущий размер файла журнала в байтах."""
+        if self._file is not None:
+            return self._size
+        try:
+            return self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def rotate(self) -> list[Path]:
+        """
+        Переключить запись на новый файл журнала.
+
+        Текущий файл переименовывается в сегмент со следующим номером
+        (сегменты прерванных компактификаций остаются как есть). Файлы не
+        копируются, поэтому блокировка писателей удерживается только на время
+        переименования.
+
+        Returns:
+            list[Path]: Все сегменты, которые покрывает снимок, записанный
+                после переключения; их нужно удалить после записи снимка.
+
+        Raises:
+            JsonStorageError: Если ошибка при работе с файлами.
+        """
+        with self._lock:
+            try:
+                self._close_locked()
+                segments = self.segments()
+                if self.path.exists():
+                    number = self._segment_number(segments[-1]) + 1 if segments else 1
+                    segment = self.path.with_name(f"{self.path.name}.{number}.compacting")
+                    os.replace(self.path, segment)
+                    segments.append(segment)
+            except OSError as e:
+                raise JsonStorageError(f"Failed to rotate booking journal: {e}")
+            self.events_written = 0
+            self._size = 0
+        return segments
+
+    def segments(self) -> list[Path]:
+        """Сегменты журнала, ожидающие компактификации, в порядке записи."""
+        pattern = glob.escape(str(self.path)) + ".*.compacting"
+        numbered = [Path(name) for name in glob.glob(pattern)]
+        numbered = [path for path in numbered if self._segment_number(path) > 0]
+        numbered.sort(key=self._segment_number)
+        if self.compacting_path.exists():
+            numbered.insert(0, self.compacting_path)
+        return numbered
+
+    def _segment_number(self, segment: Path) -> int:
+        """Номер сегмента *.N.compacting (0 - сегмент прежнего формата или чужой файл)."""
+        number = segment.name[len(self.path.name) + 1:-len(".compacting")]
+        return int(number) if number.isdigit() else 0
+
+    def _sync_locked(self) -> None:
+        """fsync под уже захваченной блокировкой."""
+        if self._file is None or self._unsynced == 0:
+            return
         try:
-            with self.guests_file.open("w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            self._file.flush()
+            os.fsync(self._file.fileno())
         except OSError as e:
-            raise JsonStorageError(f"Failed to save guests: {e}")
+            raise JsonStorageError(f"Failed to sync booking journal: {e}")
+        self._unsynced = 0
+
+    def _close_locked(self) -> None:
+        """Закрыть файл под уже захваченной блокировкой."""
+        if self._file is None:
+            return
+        self._sync_locked()
+        self._file.close()
+        self._file = None
+
+    # ===== ВОССТАНОВЛЕНИЕ =====
+
+    def replay(self, hotel: Hotel) -> int:
+        """
+        Проиграть журнал и восстановить брони отеля.
+
+        Номера и гости должны быть загружены заранее; если гость или номер
+        был добавлен после последнего сохранения, он восстанавливается из
+        данных события create. Повторное применение события не меняет
+        состояние, поэтому журнал можно проигрывать поверх снимка. Сначала
+        по возрастанию номера проигрываются сегменты *.N.compacting (если
+        компактификация была прервана), затем основной файл. Недописанная последняя строка
+        (обрыв записи при сбое) пропускается.
+
+        Args:
+            hotel (Hotel): Отель, в который восстанавливаются брони.
+
+        Returns:
+            int: Количество применённых событий.
+
+        Raises:
+            JsonStorageError: Если журнал повреждён или ссылается на неизвестную бронь.
+        """
+        applied = 0
+        self._replaying = True
+        try:
+            for path in [*self.segments(), self.path]:
+                applied += self._replay_file(hotel, path)
+        finally:
+            self._replaying = False
+        return applied
+
+    def _replay_file(self, hotel: Hotel, path: Path) -> int:
+        """Проиграть один файл журнала."""
+        if not path.exists():
+            return 0
+        try:
+            with path.open("r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError as e:
+            raise JsonStorageError(f"Failed to load booking journal: {e}")
+
+        applied = 0
+        for lineno, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError as e:
+                if lineno == len(lines) and not line.endswith("\n"):
+                    break
+                raise JsonStorageError(f"Corrupted booking journal {path} line {lineno}: {e}")
+            self._apply(hotel, event)
+            applied += 1
+        return applied
+
+    def _apply(self, hotel: Hotel, event: dict) -> None:
+        """Применить одно событие журнала к отелю."""
+        try:
+            booking_id = event["booking_id"]
+            if event["event"] == "create":
+                if booking_id in hotel.bookings:
+                    return
+                guest = hotel.guests.get(event["guest_id"])
+                if guest is None:
+                    guest = Guest(
+                        guest_id=event["guest_id"],
+                        name=event["guest_name"],
+                        contact=event["guest_contact"],
+                    )
+                    hotel.guests[guest.guest_id] = guest
+                room = hotel.rooms.get(event["room_number"])
+                if room is None:
+                    room = Room(
+                        number=event["room_number"],
+                        room_type=event["room_type"],
+                        price_per_night=event["price_per_night"],
+                    )
+                    hotel.rooms[room.number] = room
+                booking = Booking(
+                    booking_id=booking_id,
+                    guest=guest,
+                    room=room,
+                    check_in=date.fromisoformat(event["check_in"]),
+                    check_out=date.fromisoformat(event["check_out"]),
+                    status=event.get("status", BookingStatus.BOOKED),
+                )
+                hotel.add_booking(booking)
+                return
+
+            if event["event"] == "delete":
+                if booking_id in hotel.bookings:
+                    hotel.remove_booking(booking_id)
+                return
+
+            booking = hotel.bookings.get(booking_id)
+            if booking is None:
+                raise JsonStorageError(f"Unknown booking in journal: {booking_id}")
+            status = event["status"]
+            if booking.status != status:
+                hotel.set_booking_status(booking, status)
+            if status == BookingStatus.CHECKED_IN:
+                hotel.set_room_occupied(booking.room, True)
+            elif status == BookingStatus.CHECKED_OUT:
+                hotel.set_room_occupied(booking.room, False)
+        except (KeyError, ValueError, InvalidOperationError) as e:
+            raise JsonStorageError(f"Invalid journal event: {e}")
+
+
+class JournalCompactor(BookingListener):
+    """
+    Компактификация журнала броней: снимок состояния + усечение журнала.
+
+    Снимок содержит номера, гостей и брони на момент переключения журнала.
+    При запуске загружается снимок, а затем проигрывается только хвост
+    журнала. Компактификация запускается по числу событий или размеру
+    журнала; в фоновом режиме писатели блокируются только на время
+    переключения файла журнала (BookingJournal.rotate).
+    """
+
+    def __init__(
+        self,
+        hotel: Hotel,
+        journal: BookingJournal,
+        snapshot_path: str = "hotel_snapshot.json",
+        max_events: int = 10_000,
+        max_bytes: int = 8 * 1024 * 1024,
+        background: bool = True,
+    ) -> None:
+        """
+        Инициализация компактификатора.
+
+        Args:
+            hotel (Hotel): Отель, состояние которого сохраняется в снимок.
+            journal (BookingJournal): Журнал броней.
+            snapshot_path (str): Путь к файлу снимка.
+            max_events (int): Порог числа событий в журнале.
+            max_bytes (int): Порог размера журнала в байтах.
+            background (bool): Записывать снимок в фоновом потоке.
+        """
+        self.hotel = hotel
+        self.journal = journal
+        self.snapshot_path = Path(snapshot_path)
+        self.max_events = max_events
+        self.max_bytes = max_bytes
+        self.background = background
+        self._worker: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    # ===== ТРИГГЕРЫ =====
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Проверить пороги после нового события."""
+        self.maybe_compact()
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Проверить пороги после нового события."""
+        self.maybe_compact()
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Проверить пороги после нового события."""
+        self.maybe_compact()
+
+    def should_compact(self) -> bool:
+        """Превышен ли порог по числу событий или размеру журнала."""
+        if self.journal.events_written >= self.max_events:
+            return True
+        return self.journal.size_bytes() >= self.max_bytes
+
+    def maybe_compact(self) -> bool:
+        """
+        Запустить компактификацию, если превышен порог.
+
+        Returns:
+            bool: True, если компактификация была запущена.
+        """
+        if not self.should_compact():
+            return False
+        with self._start_lock:
+            if self._worker is not None and self._worker.is_alive():
+                return False
+            if not self.background:
+                self.compact()
+                return True
+            self._worker = threading.Thread(
+                target=self.compact, name="journal-compactor", daemon=True
+            )
+            self._worker.start()
+        return True
+
+    def wait(self) -> None:
+        """Дождаться завершения фоновой компактификации."""
+        worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    # ===== КОМПАКТИФИКАЦИЯ =====
+
+    def compact(self) -> None:
+        """
+        Записать снимок состояния и удалить поглощённый сегмент журнала.
+
+        События, пришедшие после переключения журнала, могут частично
+        попасть в снимок; повторное применение их при запуске безопасно.
+
+        Raises:
+            JsonStorageError: Если ошибка при записи файлов.
+        """
+        segments = self.journal.rotate()
+        try:
+            _atomic_write_json(self.snapshot_path, self._snapshot_data())
+            for segment in segments:
+                segment.unlink(missing_ok=True)
+        except OSError as e:
+            raise JsonStorageError(f"Failed to write snapshot: {e}")
+
+    def _snapshot_data(self) -> dict:
+        """
+        Сериализовать состояние отеля.
+
+        Бронь хранит данные своего гостя и номера (как событие create журнала):
+        номер с историей броней можно удалить из отеля, и без этих данных
+        бронь нельзя было бы восстановить.
+        """
+        with self.hotel.lock:
+            rooms = list(self.hotel.rooms.values())
+            guests = list(self.hotel.guests.values())
+            bookings = list(self.hotel.bookings.values())
+        return {
+            "rooms": [_room_to_dict(r) for r in rooms],
+            "guests": [_guest_to_dict(g) for g in guests],
+            "bookings": [
+                {
+                    "booking_id": b.booking_id,
+                    "guest_id": b.guest.guest_id,
+                    "guest_name": b.guest.name,
+                    "guest_contact": b.guest.contact,
+                    "room_number": b.room.number,
+                    "room_type": b.room.room_type,
+                    "price_per_night": b.room.price_per_night,
+                    "check_in": b.check_in.isoformat(),
+                    "check_out": b.check_out.isoformat(),
+                    "status": b.status,
+                }
+                for b in bookings
+            ],
+        }
+
+    # ===== ЗАГРУЗКА =====
+
+    def load(self) -> int:
+        """
+        Загрузить новейший снимок и проиграть хвост журнала.
+
+        Номера и гости из снимка добавляются, если их ещё нет в отеле.
+        Вызывается до подписки журнала и компактификатора на отель.
+
+        Returns:
+            int: Количество применённых событий журнала.
+
+        Raises:
+            JsonStorageError: Если снимок или журнал повреждены.
+        """
+        if self.snapshot_path.exists():
+            try:
+                with self.snapshot_path.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                raise JsonStorageError(f"Failed to load snapshot: {e}")
+            self._apply_snapshot(data)
+        return self.journal.replay(self.hotel)
+
+    def _apply_snapshot(self, data: dict) -> None:
+        """
+        Применить данные снимка к отелю.
+
+        Если номера или гостя брони уже нет в отеле (номер удалён), они
+        восстанавливаются из данных брони, но в отель не добавляются.
+        """
+        hotel = self.hotel
+        detached_rooms: dict = {}
+        detached_guests: dict = {}
+        try:
+            for item in data["rooms"]:
+                if item["number"] not in hotel.rooms:
+                    hotel.rooms[item["number"]] = Room(
+                        number=item["number"],
+                        room_type=item["room_type"],
+                        price_per_night=item["price_per_night"],
+                        is_occupied=item.get("is_occupied", False),
+                    )
+            for item in data["guests"]:
+                if item["guest_id"] not in hotel.guests:
+                    hotel.guests[item["guest_id"]] = Guest(
+                        guest_id=item["guest_id"],
+                        name=item["name"],
+                        contact=item["contact"],
+                    )
+            for item in data["bookings"]:
+                if item["booking_id"] in hotel.bookings:
+                    continue
+                guest = hotel.guests.get(item["guest_id"])
+                if guest is None:
+                    guest = detached_guests.get(item["guest_id"])
+                if guest is None:
+                    guest = Guest(
+                        guest_id=item["guest_id"],
+                        name=item["guest_name"],
+                        contact=item["guest_contact"],
+                    )
+                    detached_guests[guest.guest_id] = guest
+                room = hotel.rooms.get(item["room_number"])
+                if room is None:
+                    room = detached_rooms.get(item["room_number"])
+                if room is None:
+                    room = Room(
+                        number=item["room_number"],
+                        room_type=item["room_type"],
+                        price_per_night=item["price_per_night"],
+                    )
+                    detached_rooms[room.number] = room
+                booking = Booking(
+                    booking_id=item["booking_id"],
+                    guest=guest,
+                    room=room,
+                    check_in=date.fromisoformat(item["check_in"]),
+                    check_out=date.fromisoformat(item["check_out"]),
+                    status=item["status"],
+                )
+                hotel.add_booking(booking)
+                if booking.status == BookingStatus.CHECKED_IN:
+                    hotel.set_room_occupied(booking.room, True)
+        except (KeyError, ValueError, InvalidOperationError) as e:
+            raise JsonStorageError(f"Invalid snapshot data: {e}")
@@ -0,0 +1,403 @@
+"""
+Модуль для работы с SQLite-хранилищем.
+Загрузка и сохранение комнат, гостей и броней в одной базе данных.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import date
+from typing import TYPE_CHECKING, Iterator
+
+from models import Room, Guest, Booking, BookingStatus
+from booking_index import BookingListener
+from exceptions import SqliteStorageError, InvalidOperationError
+
+if TYPE_CHECKING:
+    from hotel_service import Hotel
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rooms (
+    number INTEGER PRIMARY KEY,
+    room_type TEXT NOT NULL,
+    price_per_night REAL NOT NULL,
+    is_occupied INTEGER NOT NULL DEFAULT 0,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS guests (
+    guest_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    contact TEXT NOT NULL,
+    removed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS bookings (
+    booking_id TEXT PRIMARY KEY,
+    guest_id TEXT NOT NULL,
+    room_number INTEGER NOT NULL,
+    check_in TEXT NOT NULL,
+    check_out TEXT NOT NULL,
+    status TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_bookings_room_dates
+    ON bookings (room_number, check_in, check_out);
+CREATE INDEX IF NOT EXISTS idx_bookings_guest
+    ON bookings (guest_id);
+"""
+
+# SQL-запросы - константы, поэтому sqlite3 переиспользует подготовленные выражения.
+_UPSERT_ROOM = (
+    "INSERT INTO rooms (number, room_type, price_per_night, is_occupied, removed) "
+    "VALUES (?, ?, ?, ?, 0) "
+    "ON CONFLICT(number) DO UPDATE SET room_type = excluded.room_type, "
+    "price_per_night = excluded.price_per_night, is_occupied = excluded.is_occupied, "
+    "removed = 0"
+)
+# Удалённые номера и гости помечаются removed = 1: на них могут ссылаться брони
+# из истории. Строки без ссылок удаляются физически (_PURGE_*).
+_DELETE_ROOM = "UPDATE rooms SET removed = 1 WHERE number = ?"
+_PURGE_ROOMS = (
+    "DELETE FROM rooms WHERE removed = 1 AND NOT EXISTS "
+    "(SELECT 1 FROM bookings WHERE bookings.room_number = rooms.number)"
+)
+_UPSERT_GUEST = (
+    "INSERT INTO guests (guest_id, name, contact, removed) VALUES (?, ?, ?, 0) "
+    "ON CONFLICT(guest_id) DO UPDATE SET name = excluded.name, contact = excluded.contact, "
+    "removed = 0"
+)
+_DELETE_GUEST = "UPDATE guests SET removed = 1 WHERE guest_id = ?"
+_PURGE_GUESTS = (
+    "DELETE FROM guests WHERE removed = 1 AND NOT EXISTS "
+    "(SELECT 1 FROM bookings WHERE bookings.guest_id = guests.guest_id)"
+)
+_UPSERT_BOOKING = (
+    "INSERT INTO bookings (booking_id, guest_id, room_number, check_in, check_out, status) "
+    "VALUES (?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT(booking_id) DO UPDATE SET status = excluded.status"
+)
+_DELETE_BOOKING = "DELETE FROM bookings WHERE booking_id = ?"
+_UPDATE_BOOKING_STATUS = "UPDATE bookings SET status = ? WHERE booking_id = ?"
+_UPDATE_ROOM_OCCUPIED = "UPDATE rooms SET is_occupied = ? WHERE number = ?"
+
+
+class HotelSqliteIO(BookingListener):
+    """
+    Класс для работы с SQLite-хранилищем комнат, гостей и броней.
+
+    Повторяет интерфейс HotelJsonFileIO (load_* / save_*) и дополнительно
+    хранит брони. Подписавшись на Hotel, сохраняет каждое изменение брони
+    сразу, одной короткой транзакцией. База работает в режиме WAL.
+    """
+
+    def __init__(self, db_path: str = "hotel.db") -> None:
+        """
+        Инициализация хранилища и создание схемы.
+
+        Args:
+            db_path (str): Путь к файлу базы данных.
+
+        Raises:
+            SqliteStorageError: Если не удалось открыть базу.
+        """
+        self.db_path = db_path
+        self.skipped_bookings: list[str] = []
+        self._lock = threading.Lock()
+        try:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._migrate()
+        except sqlite3.Error as e:
+            raise SqliteStorageError(f"Failed to open database: {e}")
+
+    def close(self) -> None:
+        """Закрыть соединение с базой."""
+        with self._lock:
+            self._conn.close()
+
+    # ===== КОМНАТЫ =====
+
+    def load_rooms(self) -> list[Room]:
+        """
+        Загрузить комнаты из базы.
+
+        Returns:
+            list[Room]: Список объектов Room.
+
+        Raises:
+            SqliteStorageError: Если ошибка при чтении базы.
+        """
+        rows = self._fetch(
+            "SELECT number, room_type, price_per_night, is_occupied FROM rooms "
+            "WHERE removed = 0 ORDER BY number"
+        )
+        try:
+            return [
+                Room(
+                    number=number,
+                    room_type=room_type,
+                    price_per_night=price,
+                    is_occupied=bool(occupied),
+                )
+                for number, room_type, price, occupied in rows
+            ]
+        except InvalidOperationError as e:
+            raise SqliteStorageError(f"Invalid room data: {e}")
+
+    def save_rooms(self, rooms: list[Room]) -> None:
+        """
+        Сохранить комнаты: обновить переданные и удалить отсутствующие.
+
+        Args:
+            rooms (list[Room]): Список объектов Room.
+
+        Raises:
+            SqliteStorageError: Если ошибка при записи в базу.
+        """
+        rows = [(r.number, r.room_type, r.price_per_night, int(r.is_occupied)) for r in rooms]
+        keep = {r.number for r in rooms}
+        self._replace_all(
+            _UPSERT_ROOM, rows, "SELECT number FROM rooms WHERE removed = 0", _DELETE_ROOM, keep
+        )
+
+    # ===== ГОСТИ =====
+
+    def load_guests(self) -> list[Guest]:
+        """
+        Загрузить гостей из базы.
+
+        Returns:
+            list[Guest]: Список объектов Guest.
+
+        Raises:
+            SqliteStorageError: Если ошибка при чтении базы.
+        """
+        rows = self._fetch(
+            "SELECT guest_id, name, contact FROM guests WHERE removed = 0 ORDER BY rowid"
+        )
+        try:
+            return [
+                Guest(guest_id=guest_id, name=name, contact=contact)
+                for guest_id, name, contact in rows
+            ]
+        except InvalidOperationError as e:
+            raise SqliteStorageError(f"Invalid guest data: {e}")
+
+    def save_guests(self, guests: list[Guest]) -> None:
+        """
+        Сохранить гостей: обновить переданных и удалить отсутствующих.
+
+        Args:
+            guests (list[Guest]): Список объектов Guest.
+
+        Raises:
+            SqliteStorageError: Если ошибка при записи в базу.
+        """
+        rows = [(g.guest_id, g.name, g.contact) for g in guests]
+        keep = {g.guest_id for g in guests}
+        self._replace_all(
+            _UPSERT_GUEST, rows, "SELECT guest_id FROM guests WHERE removed = 0",
+            _DELETE_GUEST, keep,
+        )
+
+    def save_changes(self, hotel: Hotel) -> None:
+        """
+        Сохранить только изменённые номера и гостей (upsert / delete по ключу).
+
+        Args:
+            hotel (Hotel): Отель с отслеживаемыми коллекциями rooms и guests.
+
+        Raises:
+            SqliteStorageError: Если ошибка при записи в базу.
+        """
+        with hotel.lock:
+            rooms, deleted_rooms = hotel.rooms.take_changes()
+            guests, deleted_guests = hotel.guests.take_changes()
+        try:
+            with self._transaction() as conn:
+                conn.executemany(
+                    _UPSERT_ROOM,
+                    [(r.number, r.room_type, r.price_per_night, int(r.is_occupied)) for r in rooms],
+                )
+                conn.executemany(_DELETE_ROOM, [(k,) for k in deleted_rooms])
+                conn.executemany(
+                    _UPSERT_GUEST, [(g.guest_id, g.name, g.contact) for g in guests]
+                )
+                conn.executemany(_DELETE_GUEST, [(k,) for k in deleted_guests])
+                self._purge_removed(conn)
+        except SqliteStorageError:
+            with hotel.lock:
+                hotel.rooms.restore_changes([r.number for r in rooms], deleted_rooms)
+                hotel.guests.restore_changes([g.guest_id for g in guests], deleted_guests)
+            raise
+
+    # ===== БРОНИ =====
+
+    def load_bookings(self, hotel: Hotel) -> list[Booking]:
+        """
+        Загрузить брони, связав их с уже загруженными гостями и номерами.
+
+        Брони удалённых номеров и гостей связываются с объектами, собранными
+        из помеченных строк (removed = 1); в отель такие объекты не попадают.
+        Брони, для номера или гостя которых строки нет вовсе, пропускаются,
+        их идентификаторы сохраняются в skipped_bookings.
+
+        Args:
+            hotel (Hotel): Отель с загруженными номерами и гостями.
+
+        Returns:
+            list[Booking]: Список объектов Booking.
+
+        Raises:
+            SqliteStorageError: Если данные брони некорректны.
+        """
+        rows = self._fetch(
+            "SELECT booking_id, guest_id, room_number, check_in, check_out, status "
+            "FROM bookings ORDER BY rowid"
+        )
+        removed_rooms = {
+            number: Room(
+                number=number, room_type=room_type, price_per_night=price,
+                is_occupied=bool(occupied),
+            )
+            for number, room_type, price, occupied in self._fetch(
+                "SELECT number, room_type, price_per_night, is_occupied FROM rooms "
+                "WHERE removed = 1"
+            )
+        }
+        removed_guests = {
+            guest_id: Guest(guest_id=guest_id, name=name, contact=contact)
+            for guest_id, name, contact in self._fetch(
+                "SELECT guest_id, name, contact FROM guests WHERE removed = 1"
+            )
+        }
+        bookings: list[Booking] = []
+        self.skipped_bookings = []
+        for booking_id, guest_id, room_number, check_in, check_out, status in rows:
+            guest = hotel.guests.get(guest_id) or removed_guests.get(guest_id)
+            room = hotel.rooms.get(room_number) or removed_rooms.get(room_number)
+            if guest is None or room is None:
+                self.skipped_bookings.append(booking_id)
+                continue
+            try:
+                bookings.append(
+                    Booking(
+                        booking_id=booking_id,
+                        guest=guest,
+                        room=room,
+                        check_in=date.fromisoformat(check_in),
+                        check_out=date.fromisoformat(check_out),
+                        status=status,
+                    )
+                )
+            except (ValueError, InvalidOperationError) as e:
+                raise SqliteStorageError(f"Invalid booking data: {e}")
+        return bookings
+
+    def save_bookings(self, bookings: list[Booking]) -> None:
+        """
+        Сохранить брони пакетной вставкой (executemany).
+
+        Args:
+            bookings (list[Booking]): Список объектов Booking.
+
+        Raises:
+            SqliteStorageError: Если ошибка при записи в базу.
+        """
+        self._executemany(_UPSERT_BOOKING, [self._booking_row(b) for b in bookings])
+
+    def on_booking_added(self, booking: Booking) -> None:
+        """Сохранить новую бронь вместе с её гостем и номером."""
+        guest, room = booking.guest, booking.room
+        with self._transaction() as conn:
+            conn.execute(_UPSERT_GUEST, (guest.guest_id, guest.name, guest.contact))
+            conn.execute(
+                _UPSERT_ROOM,
+                (room.number, room.room_type, room.price_per_night, int(room.is_occupied)),
+            )
+            conn.execute(_UPSERT_BOOKING, self._booking_row(booking))
+
+    def on_booking_status_changed(self, booking: Booking, old_status: str) -> None:
+        """Сохранить новый статус брони и флаг занятости номера."""
+        with self._transaction() as conn:
+            conn.execute(_UPDATE_BOOKING_STATUS, (booking.status, booking.booking_id))
+            if booking.status in (BookingStatus.CHECKED_IN, BookingStatus.CHECKED_OUT):
+                occupied = int(booking.status == BookingStatus.CHECKED_IN)
+                conn.execute(_UPDATE_ROOM_OCCUPIED, (occupied, booking.room.number))
+
+    def on_booking_removed(self, booking: Booking) -> None:
+        """Удалить бронь из базы (и ставшие ненужными строки удалённых сущностей)."""
+        with self._transaction() as conn:
+            conn.execute(_DELETE_BOOKING, (booking.booking_id,))
+            self._purge_removed(conn)
+
+    # ===== ВНУТРЕННИЕ МЕТОДЫ =====
+
+    @staticmethod
+    def _booking_row(b: Booking) -> tuple:
+        """Строка таблицы bookings для брони."""
+        return (
+            b.booking_id,
+            b.guest.guest_id,
+            b.room.number,
+            b.check_in.isoformat(),
+            b.check_out.isoformat(),
+            b.status,
+        )
+
+    def _migrate(self) -> None:
+        """Добавить столбец removed в базы, созданные до его появления."""
+        for table in ("rooms", "guests"):
+            columns = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if "removed" not in columns:
+                self._conn.execute(
+                    f"ALTER TABLE {table} ADD COLUMN removed INTEGER NOT NULL DEFAULT 0"
+                )
+        self._conn.commit()
+
+    @staticmethod
+    def _purge_removed(conn: sqlite3.Connection) -> None:
+        """Удалить помеченные строки номеров и гостей, на которые нет броней."""
+        conn.execute(_PURGE_ROOMS)
+        conn.execute(_PURGE_GUESTS)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Транзакция под блокировкой соединения: commit или rollback."""
+        with self._lock:
+            try:
+                yield self._conn
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                raise SqliteStorageError(f"Failed to write database: {e}")
+            except BaseException:
+                self._conn.rollback()
+                raise
+
+    def _fetch(self, sql: str) -> list[tuple]:
+        """Выполнить SELECT и вернуть все строки."""
+        try:
+            with self._lock:
+                return self._conn.execute(sql).fetchall()
+        except sqlite3.Error as e:
+            raise SqliteStorageError(f"Failed to read database: {e}")
+
+    def _executemany(self, sql: str, rows: list[tuple]) -> None:
+        """Выполнить запрос для пачки строк в одной транзакции."""
+        with self._transaction() as conn:
+            conn.executemany(sql, rows)
+
+    def _replace_all(
+        self, upsert: str, rows: list[tuple], select_keys: str, delete: str, keep: set
+    ) -> None:
+        """Обновить все строки таблицы и удалить строки с ключами не из keep."""
+        with self._transaction() as conn:
+            conn.executemany(upsert, rows)
+            stale = [(key,) for (key,) in conn.execute(select_keys) if key not in keep]
+            conn.executemany(delete, stale)
+            self._purge_removed(conn)
+
@@ -0,0 +1,74 @@
+"""
+Тесты асинхронного фасада: чтение в цикле событий во время изменений в пуле.
+"""
+
+import asyncio
+import random
+import sys
+import unittest
+from datetime import date, timedelta
+
+from hotel_service import Hotel, HotelService
+from async_service import AsyncHotelService
+from availability import AvailabilityCache
+from exceptions import HotelError
+
+BASE = date(2025, 9, 1)
+ROOMS = 60
+
+
+class AsyncReadsDuringMutationsTest(unittest.IsolatedAsyncioTestCase):
+    """Чтения без блокировки не падают, пока пул потоков меняет брони."""
+
+    async def asyncSetUp(self) -> None:
+        self._interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        hotel = Hotel("Async")
+        service = HotelService(hotel, availability_cache=AvailabilityCache(hotel))
+        self.facade = AsyncHotelService(service)
+        for number in range(1, ROOMS + 1):
+            await self.facade.add_room(number, "double", 120.0)
+        self.guest = await self.facade.register_guest("Ann", "ann@mail")
+
+    async def asyncTearDown(self) -> None:
+        await self.facade.close()
+        sys.setswitchinterval(self._interval)
+
+    async def _mutate(self, seed: int) -> None:
+        rnd = random.Random(seed)
+        for _ in range(150):
+            check_in = BASE + timedelta(days=rnd.randint(0, 60))
+            check_out = check_in + timedelta(days=rnd.randint(1, 3))
+            try:
+                booking = await self.facade.create_booking(
+                    self.guest.guest_id, rnd.randint(1, ROOMS), check_in, check_out
+                )
+                if rnd.random() < 0.4:
+                    await self.facade.cancel_booking(booking.booking_id)
+            except HotelError:
+                pass
+
+    async def _read(self, stop: asyncio.Event) -> int:
+        reads = 0
+        while not stop.is_set():
+            for _ in range(20):
+                await self.facade.get_active_bookings()
+                await self.facade.get_occupancy_report()
+                await self.facade.get_available_rooms(BASE, BASE + timedelta(days=2))
+                await self.facade.list_bookings()
+                await self.facade.get_guest_bookings(self.guest.guest_id)
+                reads += 1
+            await asyncio.sleep(0)
+        return reads
+
+    async def test_reads_run_while_writer_mutates(self) -> None:
+        stop = asyncio.Event()
+        reader = asyncio.create_task(self._read(stop))
+        await asyncio.gather(*(self._mutate(seed) for seed in range(4)))
+        stop.set()
+        self.assertGreater(await reader, 0)
+        self.facade.hotel.verify_aggregates()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+"""
+Тесты поиска свободных номеров: подсчёт по типу и битовая матрица.
+"""
+
+import random
+import unittest
+from datetime import date, timedelta
+
+from hotel_service import Hotel, HotelService
+from availability import OccupancyBitmapEngine
+from exceptions import HotelError
+
+BASE = date(2025, 5, 1)
+
+
+class CountAvailableRoomsTest(unittest.TestCase):
+    """count_available_rooms совпадает с get_available_rooms."""
+
+    def setUp(self) -> None:
+        self.hotel = Hotel("Inventory")
+        self.service = HotelService(self.hotel)
+        self.guest = self.service.register_guest("Ann", "ann@mail")
+
+    def _book(self, number: int, first: int, nights: int) -> None:
+        check_in = BASE + timedelta(days=first)
+        self.service.create_booking(
+            self.guest.guest_id, number, check_in, check_in + timedelta(days=nights)
+        )
+
+    def test_rooms_busy_on_different_nights(self) -> None:
+        self.service.add_room(1, "suite", 300.0)
+        self.service.add_room(2, "suite", 300.0)
+        self._book(1, 0, 1)
+        self._book(2, 1, 1)
+        check_out = BASE + timedelta(days=2)
+        self.assertEqual(self.service.room_inventory.max_available("suite", BASE, check_out), 1)
+        self.assertEqual(self.service.get_available_rooms(BASE, check_out, "suite"), [])
+        self.assertEqual(self.service.count_available_rooms(BASE, check_out, "suite"), 0)
+
+    def test_matches_room_search(self) -> None:
+        rnd = random.Random(17)
+        for number in range(1, 13):
+            self.service.add_room(number, rnd.choice(["single", "suite"]), 100.0)
+        for _ in range(60):
+            number, first = rnd.randint(1, 12), rnd.randint(0, 25)
+            check_in = BASE + timedelta(days=first)
+            check_out = check_in + timedelta(days=rnd.randint(1, 5))
+            if self.hotel.room_index.is_free(number, check_in, check_out):
+                self._book(number, first, (check_out - check_in).days)
+        for first in range(0, 28):
+            for nights in (1, 2, 4, 7):
+                check_in = BASE + timedelta(days=first)
+                check_out = check_in + timedelta(days=nights)
+                for room_type in ("single", "suite", "double"):
+                    rooms = self.service.get_available_rooms(check_in, check_out, room_type)
+                    actual = self.service.count_available_rooms(check_in, check_out, room_type)
+                    self.assertEqual(actual, len(rooms), (check_in, nights, room_type))
+
+    def test_bookings_of_removed_room_are_ignored(self) -> None:
+        self.service.add_room(1, "suite", 300.0)
+        self.service.add_room(2, "suite", 300.0)
+        self._book(2, 0, 2)
+        check_out = BASE + timedelta(days=2)
+        self.assertEqual(self.service.count_available_rooms(BASE, check_out, "suite"), 1)
+        self.hotel.remove_room(2)
+        self.assertEqual(self.service.count_available_rooms(BASE, check_out, "suite"), 1)
+        self._book(1, 0, 1)
+        self.assertEqual(self.service.count_available_rooms(BASE, check_out, "suite"), 0)
+
+
+class OccupancyBitmapEngineTest(unittest.TestCase):
+    """Битовая матрица совпадает с перебором броней после случайных изменений."""
+
+    def setUp(self) -> None:
+        self.hotel = Hotel("Bitmap")
+        self.engine = OccupancyBitmapEngine()
+        self.service = HotelService(self.hotel, availability_engine=self.engine)
+        for number in range(1, 11):
+            self.service.add_room(number, "single", 100.0)
+        self.guest = self.service.register_guest("Ann", "ann@mail")
+
+    def _expected(self, check_in: date, check_out: date) -> list[int]:
+        busy = {
+            b.room.number
+            for b in self.hotel.bookings.values()
+            if b.status in ("booked", "checked_in")
+            and b.check_in < check_out and check_in < b.check_out
+        }
+        return [number for number in sorted(self.hotel.rooms) if number not in busy]
+
+    def _mutate(self, rnd: random.Random) -> None:
+        # Даты по обе стороны от начальных: окно растёт влево и вправо.
+        check_in = BASE + timedelta(days=rnd.randint(-60, 60))
+        check_out = check_in + timedelta(days=rnd.randint(1, 6))
+        bookings = list(self.hotel.bookings.values())
+        action = rnd.random()
+        try:
+            if action < 0.5 or not bookings:
+                self.service.create_booking(
+                    self.guest.guest_id, rnd.randint(1, 10), check_in, check_out
+                )
+            elif action < 0.65:
+                self.service.cancel_booking(rnd.choice(bookings).booking_id)
+            elif action < 0.8:
+                booking = rnd.choice(bookings)
+                self.service.check_in(booking.booking_id, booking.check_in)
+            elif action < 0.9:
+                booking = rnd.choice(bookings)
+                self.service.check_out(booking.booking_id, booking.check_out)
+            else:
+                self.hotel.remove_booking(rnd.choice(bookings).booking_id)
+        except HotelError:
+            pass
+
+    def _assert_matches(self, rnd: random.Random) -> None:
+        rooms = sorted(self.hotel.rooms.values(), key=lambda room: room.number)
+        for _ in range(40):
+            check_in = BASE + timedelta(days=rnd.randint(-70, 70))
+            check_out = check_in + timedelta(days=rnd.randint(1, 10))
+            found = self.engine.available_rooms(rooms, check_in, check_out)
+            self.assertEqual(
+                [room.number for room in found], self._expected(check_in, check_out),
+                (check_in, check_out),
+            )
+
+    def test_matches_brute_force(self) -> None:
+        rnd = random.Random(23)
+        for step in range(400):
+            self._mutate(rnd)
+            if step % 20 == 0:
+                self._assert_matches(rnd)
+        self._assert_matches(rnd)
+        self.engine.rebuild(self.hotel.bookings.values())
+        self._assert_matches(rnd)
+
+
+if __name__ == "__main__":
+    unittest.main()
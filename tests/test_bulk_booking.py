@@ -0,0 +1,57 @@
+"""
+Тесты пакетного бронирования с некорректными запросами.
+"""
+
+import unittest
+from datetime import date, datetime, timedelta
+
+from hotel_service import Hotel, HotelService
+
+BASE = date(2025, 7, 1)
+
+
+class MalformedBulkRequestTest(unittest.TestCase):
+    """Некорректный запрос отмечается в отчёте и не прерывает вызов."""
+
+    def setUp(self) -> None:
+        self.hotel = Hotel("Bulk")
+        self.service = HotelService(self.hotel)
+        self.service.add_room(1, "single", 80.0)
+        self.guest = self.service.register_guest("Ann", "ann@mail")
+
+    def _request(self, **overrides) -> dict:
+        request = {
+            "guest_id": self.guest.guest_id,
+            "room_number": 1,
+            "check_in": BASE,
+            "check_out": BASE + timedelta(days=2),
+        }
+        request.update(overrides)
+        return request
+
+    def test_malformed_items_fail_without_exception(self) -> None:
+        report = self.service.create_bookings_bulk([
+            self._request(),
+            "not a request",
+            self._request(check_in="2025-07-01"),
+            self._request(check_out=datetime(2025, 7, 3)),
+            self._request(room_number=[1]),
+        ])
+        self.assertEqual(
+            [entry["status"] for entry in report],
+            ["not_committed", "failed", "failed", "failed", "failed"],
+        )
+        self.assertEqual(report[1]["error"], "Request must be a dict")
+        self.assertEqual(report[2]["error"], "check_in must be a date")
+        self.assertEqual(report[3]["error"], "check_out must be a date")
+        self.assertTrue(report[4]["error"].startswith("Malformed request"))
+        self.assertEqual(self.hotel.bookings, {})
+
+    def test_valid_batch_is_created(self) -> None:
+        report = self.service.create_bookings_bulk([self._request()])
+        self.assertEqual(report[0]["status"], "created")
+        self.assertIn(report[0]["booking"].booking_id, self.hotel.bookings)
+
+
+if __name__ == "__main__":
+    unittest.main()
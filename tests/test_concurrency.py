@@ -0,0 +1,221 @@
+"""
+Тесты параллельной работы HotelService: писатели и читатели в разных потоках.
+"""
+
+import random
+import sys
+import threading
+import unittest
+from datetime import date, timedelta
+
+from hotel_service import Hotel, HotelService
+from availability import AvailabilityCache, OccupancyBitmapEngine
+from booking_index import BookingListener, QueuedListener
+from exceptions import HotelError
+
+BASE = date(2025, 1, 1)
+
+
+class ConcurrentReadersTest(unittest.TestCase):
+    """Читатели не должны падать, пока писатели меняют брони."""
+
+    def setUp(self) -> None:
+        self._interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        self.hotel = Hotel("Concurrent")
+        self.service = self._make_service()
+        for number in range(1, 31):
+            self.service.add_room(number, "suite" if number % 3 == 0 else "single", 100.0)
+        self.guests = [self.service.register_guest(f"Guest {i}", f"g{i}@mail") for i in range(5)]
+
+    def tearDown(self) -> None:
+        sys.setswitchinterval(self._interval)
+
+    def _make_service(self) -> HotelService:
+        return HotelService(self.hotel)
+
+    def _run_threads(self, writer, readers, writers: int = 4, duration: int = 400) -> list:
+        """Запустить писателей и читателей; вернуть исключения читателей и писателей."""
+        errors: list = []
+        stop = threading.Event()
+
+        def write(seed: int) -> None:
+            rnd = random.Random(seed)
+            try:
+                for _ in range(duration):
+                    writer(rnd)
+            except Exception as e:  # noqa: BLE001 - нужен любой сбой
+                errors.append(e)
+
+        def read(func) -> None:
+            try:
+                while not stop.is_set():
+                    func()
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        threads = [threading.Thread(target=read, args=(f,)) for f in readers]
+        workers = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+        for thread in threads + workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return errors
+
+    def _write(self, rnd: random.Random) -> None:
+        check_in = BASE + timedelta(days=rnd.randint(0, 20))
+        check_out = check_in + timedelta(days=rnd.randint(1, 4))
+        try:
+            if rnd.random() < 0.7 or not self.hotel.bookings:
+                self.service.create_booking(
+                    rnd.choice(self.guests).guest_id, rnd.randint(1, 30), check_in, check_out
+                )
+            else:
+                self.service.cancel_booking(rnd.choice(list(self.hotel.bookings)))
+        except HotelError:
+            pass
+
+    def test_readers_do_not_crash_during_writes(self) -> None:
+        service = self.service
+        readers = [
+            service.get_active_bookings,
+            lambda: service.get_occupancy_forecast(BASE, 30),
+            lambda: service.get_availability_calendar(BASE, 30),
+            service.get_occupancy_report,
+            lambda: service.get_available_rooms(BASE, BASE + timedelta(days=3)),
+            lambda: service.find_free_windows(BASE, BASE + timedelta(days=20), 2),
+            lambda: service.count_available_rooms(BASE, BASE + timedelta(days=3), "suite"),
+            lambda: service.calculate_revenue_between(BASE, BASE + timedelta(days=30)),
+        ]
+        errors = self._run_threads(self._write, readers)
+        self.assertEqual(errors, [])
+        self.hotel.verify_aggregates()
+
+    def test_no_double_booking(self) -> None:
+        errors = self._run_threads(self._write, [], writers=8)
+        self.assertEqual(errors, [])
+        by_room: dict = {}
+        for booking in self.service.get_active_bookings():
+            by_room.setdefault(booking.room.number, []).append(booking)
+        for bookings in by_room.values():
+            bookings.sort(key=lambda b: b.check_in)
+            for first, second in zip(bookings, bookings[1:]):
+                self.assertLessEqual(first.check_out, second.check_in)
+
+
+class AvailabilityCacheTest(ConcurrentReadersTest):
+    """Кэш доступности под параллельными изменениями (и все проверки читателей с кэшем)."""
+
+    def _make_service(self) -> HotelService:
+        self.cache = AvailabilityCache(self.hotel, max_size=8)
+        return HotelService(self.hotel, availability_cache=self.cache)
+
+    def _query(self, offset: int) -> tuple:
+        check_in = BASE + timedelta(days=offset)
+        return check_in, check_in + timedelta(days=2)
+
+    def test_cache_matches_index_after_parallel_writes(self) -> None:
+        readers = [
+            (lambda offset=offset: self.service.get_available_rooms(*self._query(offset)))
+            for offset in range(0, 20, 3)
+        ]
+        errors = self._run_threads(self._write, readers)
+        self.assertEqual(errors, [])
+        for offset in range(0, 20, 3):
+            cached = self.service.get_available_rooms(*self._query(offset))
+            expected = self.service._find_available_rooms(*self._query(offset), None)
+            self.assertEqual([r.number for r in cached], [r.number for r in expected])
+
+    def test_stale_result_is_not_cached(self) -> None:
+        check_in, check_out = self._query(0)
+        generation = self.cache.generation
+        stale = self.service._find_available_rooms(check_in, check_out, None)
+        self.service.create_booking(self.guests[0].guest_id, 1, check_in, check_out)
+        self.cache.put(check_in, check_out, None, stale, generation)
+        self.assertIsNone(self.cache.get(check_in, check_out))
+        rooms = self.service.get_available_rooms(check_in, check_out)
+        self.assertNotIn(1, [r.number for r in rooms])
+
+
+class RecordingListener(BookingListener):
+    """Подписчик, записывающий события и медленно отвечающий."""
+
+    def __init__(self) -> None:
+        self.events: list = []
+        self.release = threading.Event()
+
+    def on_booking_added(self, booking) -> None:
+        self.release.wait(5)
+        self.events.append(("added", booking.booking_id, booking.status))
+
+    def on_booking_status_changed(self, booking, old_status: str) -> None:
+        self.events.append(("status", booking.booking_id, booking.status))
+
+    def on_booking_removed(self, booking) -> None:
+        self.events.append(("removed", booking.booking_id, booking.status))
+
+
+class QueuedListenerTest(unittest.TestCase):
+    """Медленный подписчик не держит Hotel.lock и получает события по порядку."""
+
+    def test_events_delivered_in_order_outside_lock(self) -> None:
+        hotel = Hotel("Queued")
+        service = HotelService(hotel)
+        service.add_room(1, "single", 50.0)
+        guest = service.register_guest("Ann", "ann@mail")
+        inner = RecordingListener()
+        queued = QueuedListener(inner)
+        hotel.add_listener(queued)
+
+        booking = service.create_booking(guest.guest_id, 1, BASE, BASE + timedelta(days=2))
+        # Подписчик ещё ждёт, но отель уже свободен для других изменений.
+        service.check_in(booking.booking_id, BASE)
+        self.assertTrue(hotel.lock.acquire(timeout=1))
+        hotel.lock.release()
+
+        inner.release.set()
+        queued.close()
+        self.assertEqual(
+            inner.events,
+            [
+                ("added", booking.booking_id, "booked"),
+                ("status", booking.booking_id, "checked_in"),
+            ],
+        )
+
+
+class OccupancyBitmapEngineTest(ConcurrentReadersTest):
+    """Битовая матрица под параллельными изменениями (и все проверки читателей с ней)."""
+
+    def _make_service(self) -> HotelService:
+        self.engine = OccupancyBitmapEngine()
+        return HotelService(self.hotel, availability_engine=self.engine)
+
+    def test_window_growth_does_not_shift_rows(self) -> None:
+        fixed = self.service.create_booking(
+            self.guests[0].guest_id, 1, BASE, BASE + timedelta(days=3)
+        )
+        history = iter(range(1, 100_000))
+
+        def write(rnd: random.Random) -> None:
+            # Каждая новая бронь раньше начала окна: окно растёт влево.
+            check_in = BASE - timedelta(days=next(history))
+            self.service.create_booking(
+                rnd.choice(self.guests).guest_id, rnd.randint(2, 30),
+                check_in, check_in + timedelta(days=1),
+            )
+
+        def read() -> None:
+            rooms = self.service.get_available_rooms(fixed.check_in, fixed.check_out)
+            if any(room.number == 1 for room in rooms):
+                raise AssertionError("room 1 reported free")
+
+        errors = self._run_threads(write, [read] * 4, writers=1, duration=3000)
+        self.assertEqual(errors, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Тесты индекса поиска гостей.
+"""
+
+import random
+import string
+import sys
+import threading
+import unittest
+from unittest import mock
+
+from hotel_service import Hotel, HotelService
+from guest_search import normalize_name
+
+
+def random_name(rnd: random.Random) -> str:
+    return " ".join(
+        "".join(rnd.choices(string.ascii_lowercase[:6], k=rnd.randint(2, 5)))
+        for _ in range(rnd.randint(1, 3))
+    )
+
+
+class GuestSearchTest(unittest.TestCase):
+    """Поиск совпадает с перебором, в том числе во время регистрации гостей."""
+
+    def setUp(self) -> None:
+        self.hotel = Hotel("Search")
+        self.service = HotelService(self.hotel)
+        self.rnd = random.Random(5)
+
+    def _expected(self, query: str, limit: int) -> list[str]:
+        prefix = normalize_name(query)
+        keys = sorted(
+            (" ".join(words[i:]), guest.guest_id)
+            for guest in self.hotel.guests.values()
+            for words in [normalize_name(guest.name).split(" ")]
+            for i in range(len(words))
+        )
+        found: dict = {}
+        for key, guest_id in keys:
+            if key.startswith(prefix) and len(found) < limit:
+                found.setdefault(guest_id)
+        return list(found)
+
+    def test_prefix_search_matches_brute_force(self) -> None:
+        # Больше _MERGE_MIN добавлений: ключи проходят через слияние списков.
+        for i in range(700):
+            self.service.register_guest(random_name(self.rnd), f"user{i}@mail")
+            if i % 50 == 0:
+                query = random_name(self.rnd)[:2]
+                found = [g.guest_id for g in self.service.search_guests(query, 25)]
+                self.assertEqual(found, self._expected(query, 25))
+        for query in ("a", "ab", "f", "cad", "b a"):
+            found = [g.guest_id for g in self.service.search_guests(query, 40)]
+            self.assertEqual(found, self._expected(query, 40))
+        self.assertEqual(
+            [g.contact for g in self.service.find_guests_by_contact("USER7@mail")],
+            ["user7@mail"],
+        )
+
+    def test_search_during_registration(self) -> None:
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        errors: list = []
+        done = threading.Event()
+
+        def register() -> None:
+            rnd = random.Random(1)
+            try:
+                for i in range(1500):
+                    self.service.register_guest(random_name(rnd), f"g{i}@mail")
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+            finally:
+                done.set()
+
+        def search() -> None:
+            try:
+                while not done.is_set():
+                    for guest in self.service.search_guests("ab", 20):
+                        self.assertIn("ab", normalize_name(guest.name))
+                    self.service.find_guests_by_contact("g1@mail")
+            except Exception as e:  # noqa: BLE001
+                errors.append(e)
+
+        index = self.service.guest_search
+        rebuild = mock.patch.object(index, "_rebuild_locked", wraps=index._rebuild_locked)
+        threads = [threading.Thread(target=register)]
+        threads += [threading.Thread(target=search) for _ in range(3)]
+        try:
+            with rebuild as rebuilds:
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+        self.assertEqual(errors, [])
+        # Регистрация через сервис не заставляет поиск перестраивать индекс.
+        self.assertEqual(rebuilds.call_count, 0)
+        found = [g.guest_id for g in self.service.search_guests("ab", 50)]
+        self.assertEqual(found, self._expected("ab", 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Тесты отката броней при ошибках подписчиков.
+"""
+
+import unittest
+from datetime import date, timedelta
+
+from hotel_service import Hotel, HotelService
+from booking_index import BookingListener
+from availability import AvailabilityCache, RoomTypeInventory
+from exceptions import BookingConflictError
+
+BASE = date(2025, 3, 1)
+
+
+class FailingListener(BookingListener):
+    """Подписчик, падающий на заданном по счёту добавлении, на удалении или смене статуса."""
+
+    def __init__(
+        self, fail_on_add: int = 0, fail_on_remove: bool = False, fail_on_status: bool = False
+    ) -> None:
+        self.fail_on_add = fail_on_add
+        self.fail_on_remove = fail_on_remove
+        self.fail_on_status = fail_on_status
+        self.added = 0
+        self.seen: set = set()
+
+    def on_booking_added(self, booking) -> None:
+        self.added += 1
+        if self.added == self.fail_on_add:
+            raise BookingConflictError("listener failed")
+        self.seen.add(booking.booking_id)
+
+    def on_booking_removed(self, booking) -> None:
+        self.seen.discard(booking.booking_id)
+        if self.fail_on_remove:
+            raise BookingConflictError("listener failed on remove")
+
+    def on_booking_status_changed(self, booking, old_status: str) -> None:
+        if self.fail_on_status:
+            raise BookingConflictError("listener failed on status")
+
+
+class ListenerRollbackTest(unittest.TestCase):
+    """Ошибка подписчика не оставляет брони и счётчики в полусостоянии."""
+
+    def setUp(self) -> None:
+        self.hotel = Hotel("Rollback")
+        self.service = HotelService(self.hotel)
+        for number in (1, 2, 3):
+            self.service.add_room(number, "suite", 300.0)
+        self.guest = self.service.register_guest("Ann", "ann@mail")
+        self.check_out = BASE + timedelta(days=2)
+
+    def _book_all_suites(self) -> None:
+        self.service.create_group_booking(self.guest.guest_id, "suite", 3, BASE, self.check_out)
+
+    def _assert_empty(self) -> None:
+        self.assertEqual(self.hotel.bookings, {})
+        self.assertEqual(self.service.count_available_rooms(BASE, self.check_out, "suite"), 3)
+        self.assertEqual(self.service.room_inventory._booked.get("suite", {}), {})
+        self.assertEqual(len(self.service.get_available_rooms(BASE, self.check_out)), 3)
+        self.hotel.verify_aggregates()
+
+    def test_failing_listener_is_not_sent_removal(self) -> None:
+        # Второй инвентарь подписан после падающего подписчика и не видит
+        # неудачную бронь - её удаление увело бы его счётчики в минус.
+        failing = FailingListener(fail_on_add=2)
+        late = RoomTypeInventory(self.hotel)
+        self.hotel.add_listener(failing)
+        self.hotel.add_listener(late)
+        with self.assertRaises(BookingConflictError):
+            self._book_all_suites()
+        self._assert_empty()
+        self.assertEqual(failing.seen, set())
+        self.assertEqual(late._booked.get("suite", {}), {})
+
+    def test_rollback_continues_when_removal_fails(self) -> None:
+        failing = FailingListener(fail_on_add=3, fail_on_remove=True)
+        self.hotel.add_listener(failing)
+        with self.assertRaisesRegex(BookingConflictError, "listener failed$"):
+            self._book_all_suites()
+        self._assert_empty()
+
+    def test_remove_notifies_every_listener(self) -> None:
+        booking = self.service.create_booking(self.guest.guest_id, 1, BASE, self.check_out)
+        first = FailingListener(fail_on_remove=True)
+        second = FailingListener()
+        for listener in (first, second):
+            listener.seen.add(booking.booking_id)
+            self.hotel.add_listener(listener)
+        with self.assertRaises(BookingConflictError):
+            self.hotel.remove_booking(booking.booking_id)
+        self.assertEqual(second.seen, set())
+        self._assert_empty()
+
+    def test_status_change_notifies_every_listener(self) -> None:
+        # Падающий подписчик стоит раньше кэша: кэш всё равно сбрасывается.
+        hotel = Hotel("Status")
+        hotel.add_listener(FailingListener(fail_on_status=True))
+        service = HotelService(hotel, availability_cache=AvailabilityCache(hotel))
+        service.add_room(1, "suite", 300.0)
+        guest = service.register_guest("Bob", "bob@mail")
+        booking = service.create_booking(guest.guest_id, 1, BASE, self.check_out)
+        self.assertEqual(service.get_available_rooms(BASE, self.check_out), [])
+
+        with self.assertRaises(BookingConflictError):
+            service.cancel_booking(booking.booking_id)
+        self.assertEqual(
+            [room.number for room in service.get_available_rooms(BASE, self.check_out)], [1]
+        )
+
+        second = service.create_booking(guest.guest_id, 1, BASE, self.check_out)
+        with self.assertRaises(BookingConflictError):
+            service.check_in(second.booking_id, BASE)
+        self.assertTrue(hotel.rooms[1].is_occupied)
+        with self.assertRaises(BookingConflictError):
+            service.check_out(second.booking_id, self.check_out)
+        self.assertFalse(hotel.rooms[1].is_occupied)
+        hotel.verify_aggregates()
+
+
+if __name__ == "__main__":
+    unittest.main()
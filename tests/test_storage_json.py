@@ -0,0 +1,191 @@
+"""
+Тесты JSON-хранилища: полная перезапись и файлы изменений.
+"""
+
+import json
+import tempfile
+import unittest
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock
+
+from models import Room
+from hotel_service import Hotel, HotelService
+from storage_json import HotelJsonFileIO, BookingJournal, JournalCompactor, _iter_json_records
+from exceptions import JsonStorageError
+
+
+class FullRewriteCrashTest(unittest.TestCase):
+    """Сбой посреди полной перезаписи не применяет старый файл изменений."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.storage = self._storage()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _storage(self) -> HotelJsonFileIO:
+        return HotelJsonFileIO(str(self.dir / "rooms.json"), str(self.dir / "guests.json"))
+
+    def _prices(self, storage: HotelJsonFileIO) -> dict:
+        return {room.number: room.price_per_night for room in storage.load_rooms()}
+
+    def test_crash_before_rename_rolls_forward(self) -> None:
+        self.storage.save_rooms([Room(1, "single", 50.0), Room(2, "double", 80.0)])
+        # Файл изменений старше полной записи ниже.
+        stale = {"number": 1, "room_type": "single", "price_per_night": 60.0}
+        self.storage.rooms_delta_file.write_text(
+            json.dumps({"op": "put", "item": stale}) + "\n", encoding="utf-8"
+        )
+        with mock.patch.object(
+            HotelJsonFileIO, "_finish_full_write", side_effect=OSError("crash")
+        ):
+            with self.assertRaises(JsonStorageError):
+                self.storage.save_rooms([Room(1, "single", 70.0), Room(2, "double", 90.0)])
+        self.assertTrue(self.storage.rooms_delta_file.exists())
+
+        self.assertEqual(self._prices(self._storage()), {1: 70.0, 2: 90.0})
+        self.assertFalse(self.storage.rooms_delta_file.exists())
+        self.assertFalse((self.dir / "rooms.json.new").exists())
+
+    def test_full_rewrite_absorbs_delta(self) -> None:
+        self.storage.save_rooms([Room(1, "single", 50.0)])
+        self.storage.rooms_delta_file.write_text(
+            json.dumps({"op": "delete", "number": 1}) + "\n", encoding="utf-8"
+        )
+        self.assertEqual(self._prices(self.storage), {})
+        self.storage.save_rooms([Room(3, "suite", 200.0)])
+        self.assertFalse(self.storage.rooms_delta_file.exists())
+        self.assertEqual(self._prices(self.storage), {3: 200.0})
+
+
+class JournalSegmentsTest(unittest.TestCase):
+    """Прерванные компактификации оставляют нумерованные сегменты."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+        self.journal_path = self.dir / "bookings.jsonl"
+        self.hotel, self.service, self.journal = self._open()
+        self.service.add_room(1, "single", 50.0)
+        self.service.add_room(2, "double", 80.0)
+        self.guest = self.service.register_guest("Ann", "ann@mail")
+
+    def tearDown(self) -> None:
+        self.journal.close()
+        self._tmp.cleanup()
+
+    def _open(self) -> tuple:
+        hotel = Hotel("Journal")
+        service = HotelService(hotel)
+        journal = BookingJournal(str(self.journal_path), sync_every=1)
+        return hotel, service, journal
+
+    def _compactor(self, hotel: Hotel, journal: BookingJournal) -> JournalCompactor:
+        return JournalCompactor(
+            hotel, journal, str(self.dir / "snapshot.json"), background=False
+        )
+
+    def _book(self, room: int, offset: int):
+        check_in = date(2025, 8, 1) + timedelta(days=offset)
+        return self.service.create_booking(
+            self.guest.guest_id, room, check_in, check_in + timedelta(days=1)
+        )
+
+    def test_rotations_create_segments_replayed_in_order(self) -> None:
+        self.hotel.add_listener(self.journal)
+        first = self._book(1, 0)
+        self.journal.rotate()
+        self.service.check_in(first.booking_id, first.check_in)
+        second = self._book(2, 0)
+        self.journal.rotate()
+        self.service.check_out(first.booking_id, first.check_out)
+        self.service.cancel_booking(second.booking_id)
+        self.journal.close()
+
+        names = sorted(path.name for path in self.journal.segments())
+        self.assertEqual(
+            names, ["bookings.jsonl.1.compacting", "bookings.jsonl.2.compacting"]
+        )
+
+        # Номера и гости восстанавливаются из событий create.
+        hotel, service, journal = self._open()
+        compactor = self._compactor(hotel, journal)
+        self.assertEqual(compactor.load(), 5)
+        statuses = {b.booking_id: b.status for b in service.list_bookings()}
+        self.assertEqual(
+            statuses, {first.booking_id: "checked_out", second.booking_id: "cancelled"}
+        )
+
+        compactor.compact()
+        self.assertEqual(journal.segments(), [])
+        journal.close()
+
+    def test_legacy_segment_is_replayed_first(self) -> None:
+        self.hotel.add_listener(self.journal)
+        booking = self._book(1, 0)
+        self.journal.close()
+        self.journal_path.rename(self.dir / "bookings.jsonl.compacting")
+        self.service.check_in(booking.booking_id, booking.check_in)
+        self.journal.close()
+
+        segments = self.journal.rotate()
+        self.assertEqual(
+            [path.name for path in segments],
+            ["bookings.jsonl.compacting", "bookings.jsonl.1.compacting"],
+        )
+        hotel, service, journal = self._open()
+        self.assertEqual(journal.replay(hotel), 2)
+        self.assertEqual(service.get_booking(booking.booking_id).status, "checked_in")
+
+    def test_snapshot_keeps_bookings_of_removed_room(self) -> None:
+        self.hotel.add_listener(self.journal)
+        first = self._book(1, 0)
+        self.service.check_in(first.booking_id, first.check_in)
+        self.service.check_out(first.booking_id, first.check_out)
+        second = self._book(2, 0)
+        self.hotel.remove_room(1)
+        self._compactor(self.hotel, self.journal).compact()
+        self.journal.close()
+
+        hotel, service, journal = self._open()
+        self._compactor(hotel, journal).load()
+        journal.close()
+        self.assertEqual(sorted(hotel.rooms), [2])
+        restored = service.get_booking(first.booking_id)
+        self.assertEqual(restored.status, "checked_out")
+        self.assertEqual((restored.room.number, restored.room.room_type), (1, "single"))
+        self.assertEqual(restored.guest.name, "Ann")
+        self.assertEqual(service.get_booking(second.booking_id).status, "booked")
+
+
+class StreamingLoadTest(unittest.TestCase):
+    """Потоковое чтение JSON-массивов и фоновая загрузка."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_scalars_split_by_chunk_boundary(self) -> None:
+        path = self.dir / "values.json"
+        for text in ("[12345, 678]", "[1.5e-7,true,null, -42]", '[{"a": 10}, 2.25, "x"]'):
+            path.write_text(text, encoding="utf-8")
+            for chunk_size in (1, 2, 3, 5):
+                records = list(_iter_json_records(path, chunk_size=chunk_size))
+                self.assertEqual(records, json.loads(text), (text, chunk_size))
+
+    def test_background_load_error_is_raised_from_join(self) -> None:
+        (self.dir / "rooms.json").write_text('[{"number": 1}]', encoding="utf-8")
+        storage = HotelJsonFileIO(str(self.dir / "rooms.json"), str(self.dir / "guests.json"))
+        thread = storage.load_into(Hotel("Background"), background=True)
+        with self.assertRaises(JsonStorageError):
+            thread.join()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Тесты SQLite-хранилища: брони удалённых номеров и гостей.
+"""
+
+import tempfile
+import unittest
+from datetime import date
+from pathlib import Path
+
+from hotel_service import Hotel, HotelService
+from storage_sqlite import HotelSqliteIO
+
+
+class RemovedEntitiesTest(unittest.TestCase):
+    """Удаление номера не лишает его брони связи при следующей загрузке."""
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = str(Path(self._tmp.name) / "hotel.db")
+        self.storage = HotelSqliteIO(self.db_path)
+        self.hotel = Hotel("SQLite")
+        self.service = HotelService(self.hotel)
+        self.hotel.add_listener(self.storage)
+        self.service.add_room(1, "single", 50.0)
+        self.service.add_room(2, "double", 80.0)
+        self.guest = self.service.register_guest("Ann", "ann@mail")
+        self.storage.save_changes(self.hotel)
+
+    def tearDown(self) -> None:
+        self.storage.close()
+        self._tmp.cleanup()
+
+    def _reload(self) -> tuple:
+        self.storage.close()
+        self.storage = HotelSqliteIO(self.db_path)
+        hotel = Hotel("Reloaded")
+        service = HotelService(hotel)
+        for room in self.storage.load_rooms():
+            hotel.rooms[room.number] = room
+        for guest in self.storage.load_guests():
+            hotel.guests[guest.guest_id] = guest
+        for booking in self.storage.load_bookings(hotel):
+            hotel.add_booking(booking)
+        return hotel, service
+
+    def test_bookings_of_removed_room_are_loaded(self) -> None:
+        first = self.service.create_booking(
+            self.guest.guest_id, 1, date(2025, 8, 1), date(2025, 8, 3)
+        )
+        self.service.check_in(first.booking_id, first.check_in)
+        self.service.check_out(first.booking_id, first.check_out)
+        second = self.service.create_booking(
+            self.guest.guest_id, 2, date(2025, 8, 1), date(2025, 8, 3)
+        )
+        self.hotel.remove_room(1)
+        self.storage.save_changes(self.hotel)
+
+        hotel, service = self._reload()
+        self.assertEqual(sorted(hotel.rooms), [2])
+        self.assertEqual(self.storage.skipped_bookings, [])
+        restored = service.get_booking(first.booking_id)
+        self.assertEqual(restored.status, "checked_out")
+        self.assertEqual((restored.room.number, restored.room.room_type), (1, "single"))
+        self.assertEqual(service.get_booking(second.booking_id).status, "booked")
+
+    def test_unreferenced_rows_are_purged(self) -> None:
+        self.hotel.remove_room(1)
+        self.storage.save_changes(self.hotel)
+        rows = self.storage._fetch("SELECT number FROM rooms ORDER BY number")
+        self.assertEqual(rows, [(2,)])
+
+    def test_booking_without_rows_is_skipped(self) -> None:
+        booking = self.service.create_booking(
+            self.guest.guest_id, 1, date(2025, 8, 1), date(2025, 8, 3)
+        )
+        with self.storage._transaction() as conn:
+            conn.execute("DELETE FROM rooms WHERE number = 1")
+
+        hotel, _ = self._reload()
+        self.assertEqual(self.storage.skipped_bookings, [booking.booking_id])
+        self.assertEqual(hotel.bookings, {})
+
+
+if __name__ == "__main__":
+    unittest.main()